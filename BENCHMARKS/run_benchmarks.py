@@ -0,0 +1,293 @@
+"""Time every converter and corpus builder on the shipped and scaled-up inputs.
+
+    python BENCHMARKS/run_benchmarks.py                      # scales 1, 10 and 100
+    python BENCHMARKS/run_benchmarks.py --scales 1 10 english yami
+    python BENCHMARKS/run_benchmarks.py --no-save            # don't record the run
+    python BENCHMARKS/run_benchmarks.py --canon spanish      # also a whole-Bible input
+
+A scale-N converter input is the shipped raw file repeated N times, so it
+has exactly the layout the converter expects (pipe-delimited English,
+tab-delimited Cebuano 40N lines, chapter:verse Tagalog/Spanish, book
+headers for Ilocano/Waray/Yami, ...).  A scale-N corpus input is the
+shipped verse store repeated N times with each copy moved to its own
+chapters, so the join sees N times as many distinct verses rather than
+N times as many duplicates.  Every step runs in a fresh interpreter and
+reports its wall time, throughput and peak RSS.  Each run is appended to
+BENCHMARKS/results.jsonl and compared against the previous run, so a
+slowdown shows up as soon as it is measured.
+
+With --canon the chapter:verse converters (Spanish, Tagalog) also run on a
+whole-Bible input: 66 books with their real chapter counts, each opened by
+a header line with the book's name in that language, and chapters filled
+from the shipped gospels.  The converter runs with --canon, and the run
+fails unless every book comes out with all of its chapters.  Its lines/s
+and peak RSS next to the x1 and x10 rows show whether time and memory
+grow linearly with the input.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(base_dir))
+
+benchmarks_dir = base_dir / "BENCHMARKS"
+results_file = benchmarks_dir / "results.jsonl"
+
+
+# === MEASUREMENT (runs in the child process) ===
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def count_lines(path):
+    with open(path, "rb") as f:
+        return sum(1 for _ in f)
+
+
+def measure_converter(script, input_file, output_dir, canon=""):
+    from PIPELINE.books import CANON
+    from PIPELINE.convert_all import load_converter
+    from PIPELINE.engine import convert
+
+    parser = load_converter(script).PARSER
+    if canon:
+        parser.books = CANON
+    start = time.perf_counter()
+    convert(parser, input_file, output_dir, verbose=False)
+    return time.perf_counter() - start, count_lines(input_file)
+
+
+def check_canon(language, output_dir):
+    """Fail unless the store holds every book of the Bible with all its chapters."""
+    from PIPELINE.books import BOOKS, CHAPTERS
+    from PIPELINE.verse_store import read_table
+
+    table = read_table(language, output_dir, columns=["book", "chapter"])
+    chapters = {}
+    for book, chapter in zip(table["book"].to_pylist(), table["chapter"].to_pylist()):
+        chapters[book] = max(chapters.get(book, 0), chapter)
+    expected = dict(zip(BOOKS, CHAPTERS[1:]))
+    if chapters != expected:
+        wrong = sorted(set(chapters.items()) ^ set(expected.items()))
+        raise RuntimeError(f"{language}: books misassigned in the whole-Bible input: {wrong[:6]}")
+
+
+def measure_corpus(code1, code2, output_dir):
+    from PIPELINE.alignment import VerseAligner, pair_output_path, write_table
+
+    start = time.perf_counter()
+    aligner = VerseAligner([code1, code2], output_dir)
+    table = aligner.pair(code1, code2)
+    write_table(table, Path(output_dir) / pair_output_path(code1, code2).name)
+    rows = sum(len(aligner.texts[code]) for code in (code1, code2))
+    return time.perf_counter() - start, rows
+
+
+def worker(args):
+    if args[0] == "convert":
+        seconds, lines = measure_converter(*args[1:])
+    else:
+        seconds, lines = measure_corpus(*args[1:])
+    print(json.dumps({"seconds": seconds, "lines": lines, "peak_rss_mb": peak_rss_mb()}))
+
+
+# === DRIVER ===
+def scaled_input(raw_file, scale, directory):
+    """Write the raw file repeated `scale` times and return its path."""
+    if scale == 1:
+        return raw_file
+    path = Path(directory) / f"x{scale}_{raw_file.name}"
+    text = raw_file.read_text(encoding="utf-8")
+    if not text.endswith("\n"):
+        text += "\n"
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(scale):
+            f.write(text)
+    return path
+
+
+def canon_input(raw_file, language, directory):
+    """Write a whole-Bible input in the `chapter:verse text` layout and return its path."""
+    import re
+
+    from PIPELINE.books import CANON, CHAPTERS, header_names
+
+    # The shipped chapters, each a list of verse texts
+    chapters = []
+    last = None
+    for line in raw_file.read_text(encoding="utf-8").splitlines():
+        m = re.match(r"\s*(\d+):(\d+)\s+(.*)", line)
+        if m:
+            if m.group(1) != last:
+                chapters.append([])
+                last = m.group(1)
+            chapters[-1].append(m.group(3))
+
+    path = Path(directory) / f"canon_{raw_file.name}"
+    source = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for book, name in zip(CANON, header_names(language, CANON)):
+            f.write(f"{name}\n\n")
+            for chapter in range(1, CHAPTERS[book] + 1):
+                for verse, text in enumerate(chapters[source % len(chapters)], start=1):
+                    f.write(f"{chapter}:{verse} {text}\n\n")
+                source += 1
+    return path
+
+
+def scaled_store(language, scale, directory):
+    """Write `language`'s verse store repeated `scale` times under new chapter numbers."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    from PIPELINE.verse_key import BOOK_SHIFT, CHAPTER_SHIFT
+    from PIPELINE.verse_store import read_table, store_path
+
+    table = read_table(language, columns=["key", "end_key", "text"])
+    copies = []
+    for copy in range(scale):
+        # 32 chapter slots per copy, then move on to the next three books
+        shift = pa.scalar(((copy % 32) * 32 << CHAPTER_SHIFT) + ((copy // 32) * 3 << BOOK_SHIFT), pa.int64())
+        shifted = table.set_column(0, "key", pc.add(table["key"], shift))
+        copies.append(shifted.set_column(1, "end_key", pc.add(table["end_key"], shift)))
+    pq.write_table(pa.concat_tables(copies), store_path(language, directory))
+
+
+def run_step(*args):
+    """Run one measurement in a fresh interpreter and return its result dict."""
+    result = subprocess.run([sys.executable, __file__, "--worker", *map(str, args)],
+                            cwd=base_dir, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"{' '.join(map(str, args))} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+# Converters that read `chapter:verse text` lines and can take a whole Bible
+canon_languages = ["spanish", "tagalog"]
+
+
+def run_benchmarks(scales, languages=None, corpus=True, canon=False):
+    from PIPELINE.alignment import LANGUAGES
+    from PIPELINE.convert_all import discover_converters, load_converter
+
+    converters = discover_converters()
+    if languages:
+        converters = {lang: converters[lang] for lang in languages}
+    pairs = []
+    if corpus:
+        for script in sorted((base_dir / "CORPUS_FILES").glob("*_corpus.py")):
+            code1, code2 = script.stem.upper().split("_")[:2]
+            if LANGUAGES[code1].store in converters and LANGUAGES[code2].store in converters:
+                pairs.append((code1, code2))
+
+    results = []
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            for language, script in converters.items():
+                raw_file = base_dir / "RAW_FILES" / load_converter(script).PARSER.raw_file
+                input_file = scaled_input(raw_file, scale, tmp)
+                result = run_step("convert", script, input_file, tmp)
+                results.append({"step": f"convert:{language}", "scale": scale, **result})
+                report(results[-1])
+            for language in {LANGUAGES[code].store for pair in pairs for code in pair}:
+                scaled_store(language, scale, tmp)
+            for code1, code2 in pairs:
+                result = run_step("corpus", code1, code2, tmp)
+                results.append({"step": f"corpus:{code1}-{code2}", "scale": scale, **result})
+                report(results[-1])
+    if canon:
+        with tempfile.TemporaryDirectory() as tmp:
+            for language in canon_languages:
+                if language not in converters:
+                    continue
+                script = converters[language]
+                raw_file = base_dir / "RAW_FILES" / load_converter(script).PARSER.raw_file
+                input_file = canon_input(raw_file, language, tmp)
+                result = run_step("convert", script, input_file, tmp, "canon")
+                check_canon(language, tmp)
+                results.append({"step": f"convert:{language}", "scale": "canon", **result})
+                report(results[-1])
+    return results
+
+
+def report(result, previous=None):
+    rate = result["lines"] / result["seconds"] if result["seconds"] else 0
+    rss = result["peak_rss_mb"]
+    line = (f"{result['step']:<22} x{result['scale']:<4} {result['seconds']:8.2f}s "
+            f"{rate:12,.0f} lines/s  " + (f"{rss:8.1f} MB" if rss is not None else "     n/a"))
+    if previous:
+        change = (result["seconds"] - previous["seconds"]) / previous["seconds"] * 100
+        line += f"  {change:+6.1f}% time vs last run"
+    print(line)
+
+
+def git_commit():
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                            cwd=base_dir, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def load_previous():
+    """{(step, scale): result} from the last recorded run."""
+    if not results_file.exists():
+        return {}
+    lines = results_file.read_text(encoding="utf-8").splitlines()
+    if not lines:
+        return {}
+    last = json.loads(lines[-1])
+    return {(r["step"], r["scale"]): r for r in last["results"]}
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark the converters and corpus builders.")
+    parser.add_argument("languages", nargs="*", help="languages to benchmark (default: all)")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="input sizes as multiples of the shipped files (default: 1 10 100)")
+    parser.add_argument("--no-corpus", action="store_true", help="skip the corpus builders")
+    parser.add_argument("--canon", action="store_true",
+                        help="also convert a whole-Bible input (Spanish and Tagalog)")
+    parser.add_argument("--no-save", action="store_true", help=f"don't append to {results_file.name}")
+    args = parser.parse_args()
+
+    previous = load_previous()
+    results = run_benchmarks(args.scales, args.languages, corpus=not args.no_corpus,
+                             canon=args.canon)
+
+    if previous:
+        print("\n=== COMPARED WITH THE LAST RUN ===")
+        for result in results:
+            report(result, previous.get((result["step"], result["scale"])))
+
+    if not args.no_save:
+        run = {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }
+        benchmarks_dir.mkdir(exist_ok=True)
+        with open(results_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run) + "\n")
+        print(f"\nSaved -> {results_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,108 +1,99 @@
 import re
+import sys
 from pathlib import Path
-import pandas as pd
-
-def clean_bible_text_to_excel():
-    input_file = Path("RAW_FILES/bikolano_bible.txt")
-    output_file_excel = Path("CONVERTED_FILES/bikolano_bible_cleaned.xlsx")
-    output_file_sentences = Path("CONVERTED_FILES/bikolano_sentences.txt")  # renamed file
-
-    current_verse = ""
-    current_book = None
-    current_chapter = None
-    rows = []
-    segmented_sentences = []  # store each full sentence
-
-    with open(input_file, "r", encoding="utf-8") as infile:
-        for line in infile:
-            stripped = line.strip()
-            if not stripped:
-                continue
 
-            # --- Delete lines that are just numbers or "Central Bikol" ---
-            if stripped.isdigit() or stripped == "Central Bikol":
-                continue
+base_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(base_dir))
+
+from PIPELINE.books import header_pattern
+from PIPELINE.engine import BibleParser, Verse, main
+from PIPELINE.line_classifier import LineClassifier
+from PIPELINE.normalizer import Normalizer
+from PIPELINE.segmenter import Segmenter
+
+paren_re = re.compile(r"\([^)]*\)")
+remove_punct = Normalizer(r"[^A-Za-z\s]", strip=False)
+
+# Checked in this order; anything else is continuation text
+verse_rules = [
+    # Book + chapter lines (Mateo 1, Lukas 3, etc.)
+    ("book", rf"(?P<book>{header_pattern('bikolano')})\s+(?P<chapter>\d+)"),
+    # Verse range at start: n-m
+    ("range", r"(?P<start>\d+)-(?P<end>\d+)(?P<text>.*)"),
+    ("verse", r"(?P<number>\d+)(?P<text>.*)"),
+]
+# Blank lines, page numbers and the "Central Bikol" running header
+line_classifier = LineClassifier([("skip", r"(?:\d+|Central Bikol|)$")] + verse_rules)
+# Once its references are removed a line is never noise ("12 (Mat 1:1)" is verse 12)
+ref_line_classifier = LineClassifier(verse_rules)
+
+
+class BikolanoParser(BibleParser):
+    """`Mateo 1` headers followed by verses glued to their number (`1Iyo ini...`)."""
+
+    language = "bikolano"
+    raw_file = "bikolano_bible.txt"
+    excel_file = "bikolano_bible_cleaned.xlsx"
+    sentences_file = "bikolano_sentences.txt"
+    normalizer = remove_punct
+    # Each full verse on its own line, a range's text only once
+    segmenter = Segmenter(keep_empty=True)
+    range_sentences_per_verse = False
+
+    # Page numbers and the "Central Bikol" running header
+    noise_re = r"\d*|Central Bikol"
+    shard_re = rf"{header_pattern('bikolano')}\s+\d"
 
-            # Remove parentheses (cross references, etc.)
-            no_refs = re.sub(r"\([^)]*\)", "", stripped).strip()
+    def classify(self, line):
+        stripped = line.strip()
+        # Remove parentheses (cross references, etc.)
+        if "(" in stripped:
+            return ref_line_classifier.classify(paren_re.sub("", stripped).strip())
+        return line_classifier.classify(stripped)
 
-            # Detect book+chapter lines (Mateo 1, Lukas 3, etc.)
-            book_chapter_match = re.match(r"^(Mateo|Lukas|Markos)\s+(\d+)", no_refs)
-            if book_chapter_match:
+    def assemble(self, items):
+        # The verse being collected: its number and its text so far
+        current_number = None
+        current_text = ""
+        current_book = None
+        current_chapter = None
+
+        for kind, fields in items:
+            if kind == "skip":
+                continue
+
+            if kind == "book":
                 # Save previous verse
-                if current_verse:
-                    verse_num = re.match(r"^(\d+)", current_verse)
-                    if verse_num:
-                        text = re.sub(r"^\d+\s*", "", current_verse).strip()
-                        text = re.sub(r"[^A-Za-z\s]", "", text)
-                        rows.append({
-                            "Book": current_book,
-                            "Chapter": current_chapter,
-                            "Verse": verse_num.group(1),
-                            "Text": text
-                        })
-                        segmented_sentences.append(text)
-                current_verse = ""
-                current_book, current_chapter = book_chapter_match.groups()
+                if current_number is not None:
+                    yield Verse(current_book, current_chapter, current_number, current_text.strip())
+                current_number = None
+                current_book, current_chapter = fields["book"], fields["chapter"]
                 continue
 
             # Skip non-verse headings
-            if not re.match(r"^\d+", no_refs) and not current_verse:
+            if kind == "text":
+                if current_number is not None:
+                    current_text += " " + fields["text"]
                 continue
 
             # Verse start
-            if re.match(r"^\d+", no_refs):
-                if current_verse:
-                    verse_num = re.match(r"^(\d+)", current_verse)
-                    if verse_num:
-                        text = re.sub(r"^\d+\s*", "", current_verse).strip()
-                        text = re.sub(r"[^A-Za-z\s]", "", text)
-                        rows.append({
-                            "Book": current_book,
-                            "Chapter": current_chapter,
-                            "Verse": verse_num.group(1),
-                            "Text": text
-                        })
-                        segmented_sentences.append(text)
-
-                # Handle verse range at start: n-m
-                m = re.match(r"^(\d+)-(\d+)(.*)", no_refs)
-                if m:
-                    n1, n2, verse_text = m.groups()
-                    verse_text = verse_text.strip()
-                    verse_text = re.sub(r"[^A-Za-z\s]", "", verse_text)
-                    rows.append({"Book": current_book, "Chapter": current_chapter, "Verse": n1, "Text": verse_text})
-                    rows.append({"Book": current_book, "Chapter": current_chapter, "Verse": n2, "Text": verse_text})
-                    segmented_sentences.append(verse_text)
-                    current_verse = ""
-                else:
-                    current_verse = re.sub(r"^(\d+)", r"\1 ", no_refs, count=1)
+            if current_number is not None:
+                yield Verse(current_book, current_chapter, current_number, current_text.strip())
+
+            if kind == "range":
+                verse_text = fields["text"].strip()
+                verses = tuple(str(n) for n in range(int(fields["start"]), int(fields["end"]) + 1))
+                yield Verse(current_book, current_chapter, fields["start"], verse_text, verses=verses)
+                current_number = None
             else:
-                current_verse += " " + no_refs
-
-    # Save last verse
-    if current_verse:
-        verse_num = re.match(r"^(\d+)", current_verse)
-        if verse_num:
-            text = re.sub(r"^\d+\s*", "", current_verse).strip()
-            text = re.sub(r"[^A-Za-z\s]", "", text)
-            rows.append({
-                "Book": current_book,
-                "Chapter": current_chapter,
-                "Verse": verse_num.group(1),
-                "Text": text
-            })
-            segmented_sentences.append(text)
-
-    # Save segmented sentences (each full sentence per line)
-    output_file_sentences.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_file_sentences, "w", encoding="utf-8") as segfile:
-        for s in segmented_sentences:
-            segfile.write(s.strip() + "\n")
-
-    # Save to Excel (Book, Chapter, Verse, Text separated)
-    df = pd.DataFrame(rows, columns=["Book", "Chapter", "Verse", "Text"])
-    df.to_excel(output_file_excel, index=False)
-
-# Run cleaning
-clean_bible_text_to_excel()
+                current_number, current_text = fields["number"], fields["text"]
+
+        # Save last verse
+        if current_number is not None:
+            yield Verse(current_book, current_chapter, current_number, current_text.strip())
+
+
+PARSER = BikolanoParser()
+
+if __name__ == "__main__":
+    main(PARSER)
@@ -1,62 +1,57 @@
 import re
-import pandas as pd
+import sys
 from pathlib import Path
 
 # File paths
 base_dir = Path(__file__).resolve().parent.parent
-input_file = base_dir / "RAW_FILES" / "cebuano_bible.txt"
-output_excel = base_dir / "CONVERTED_FILES" / "cebuano_bible_cleaned.xlsx"
-output_segmented = base_dir / "CONVERTED_FILES" / "cebuano_segmented.txt"
-
-# Map book IDs to names
-book_map = {
-    "40N": "Matthew",
-    "41N": "Mark",
-    "42N": "Luke"
-}
-
-verses_data = []
-segmented_sentences = []
-
-# Read and parse the input file
-with open(input_file, "r", encoding="utf-8") as f:
-    for line in f:
+sys.path.insert(0, str(base_dir))
+
+from PIPELINE.books import book_name
+from PIPELINE.engine import BibleParser, Verse, main
+from PIPELINE.normalizer import Normalizer
+
+# Map book IDs (40N = Matthew) to names
+book_map = {f"{book}N": book_name(book) for book in range(1, 67)}
+
+remove_punct = Normalizer(r"[^A-Za-z\s]")
+sentence_split_re = re.compile(r"[.!?]+")
+
+
+class CebuanoParser(BibleParser):
+    """Tab-delimited `40N<TAB>chapter<TAB>verse<TAB>text` lines."""
+
+    language = "cebuano"
+    raw_file = "cebuano_bible.txt"
+    excel_file = "cebuano_bible_cleaned.xlsx"
+    sentences_file = "cebuano_segmented.txt"
+
+    def classify(self, line):
         parts = line.strip().split("\t")
         if len(parts) < 4:
-            continue  # skip malformed lines
+            return None  # skip malformed lines
+        return parts[:4]
+
+    def assemble(self, items):
+        for parts in items:
+            if parts is None:
+                continue
+            book_id, chapter, verse, text = parts
+            yield Verse(book_map.get(book_id, "Unknown"), chapter, verse, text)
 
-        book_id, chapter, verse, text = parts[0], parts[1], parts[2], parts[3]
-        book_name = book_map.get(book_id, "Unknown")
+    def clean(self, verse):
+        return self.clean_batch([verse])[0]
 
+    def clean_batch(self, verses):
         # --- Remove punctuation, keep only letters and spaces ---
-        text_cleaned = re.sub(r"[^A-Za-z\s]", "", text)
-
-        # Add to main list
-        verses_data.append({
-            "Book": book_name,
-            "Chapter": chapter,
-            "Verse": verse,
-            "Text": text_cleaned.strip()
-        })
-
-        # --- Sentence segmentation ---
-        # Split by sentence-ending punctuation (., ?, !) before cleaning
-        for sentence in re.split(r"[.!?]+", text):
-            sentence = sentence.strip()
-            if sentence:
-                # Clean punctuation from each sentence
-                sentence_cleaned = re.sub(r"[^A-Za-z\s]", "", sentence)
-                segmented_sentences.append(sentence_cleaned.strip())
-
-# --- Save cleaned data to Excel ---
-df = pd.DataFrame(verses_data, columns=["Book", "Chapter", "Verse", "Text"])
-output_excel.parent.mkdir(parents=True, exist_ok=True)
-df.to_excel(output_excel, index=False)
-
-# --- Save segmented sentences to text file ---
-with open(output_segmented, "w", encoding="utf-8") as seg_file:
-    for s in segmented_sentences:
-        seg_file.write(s + "\n")
-
-print(f"Cleaned Excel saved to: {output_excel}")
-print(f"Segmented sentences saved to: {output_segmented}")
+        # Split by sentence-ending punctuation (., ?, !) before cleaning, so
+        # the verse and its sentences come out of the same pass
+        results = remove_punct.split_batch([verse.text for verse in verses], sentence_split_re)
+        return [verse._replace(text=text, spans=[(start, end) for sentence, start, end in pieces
+                                                  if sentence.strip()])
+                for verse, (text, pieces) in zip(verses, results)]
+
+
+PARSER = CebuanoParser()
+
+if __name__ == "__main__":
+    main(PARSER)
@@ -1,55 +1,46 @@
 import re
-import pandas as pd
+import sys
 from pathlib import Path
 
 base_dir = Path(__file__).resolve().parent.parent
-input_file = base_dir / "RAW_FILES" / "chavacano_bible.txt"
-excel_output = base_dir / "CONVERTED_FILES" / "chavacano_bible_cleaned.xlsx"
-sentences_output = base_dir / "CONVERTED_FILES" / "chavacano_sentences.txt"
-
-def clean_and_convert_bible(in_file, excel_out, sentences_out):
-    # Prepare regex patterns
-    book_pattern = re.compile(r"^\s*\d*\s*(Mateo|Marcos|Lucas)(?:[\s\d,]*)$")
-    copyright_pattern = re.compile(
-        r"^The New Testament in Chavacano of the Philippines;.*Wycliffe Bible Translators, Inc\.?$"
-    )
-    verse_splitter = re.compile(r"(?=\b\d+[A-Za-z]*)")  # to detect verse numbers
-
-    cleaned_lines = []
+sys.path.insert(0, str(base_dir))
+
+from PIPELINE.books import BookTracker, header_names, header_pattern
+from PIPELINE.engine import BibleParser, Verse, main
+from PIPELINE.line_classifier import LineClassifier
+from PIPELINE.normalizer import Normalizer
+from PIPELINE.segmenter import Segmenter
+
+# Prepare regex patterns
+# Book headers and the copyright line are dropped; everything else is text
+book_line = rf"\d*\s*{header_pattern('chavacano')}(?:[\s\d,]*)"
+copyright_line = r"The New Testament in Chavacano of the Philippines;.*Wycliffe Bible Translators, Inc\.?"
+noise_classifier = LineClassifier([
+    ("book", rf"\s*{book_line}$"),
+    ("copyright", rf"{copyright_line}$"),
+])
+verse_splitter = re.compile(r"(?=\b\d+[A-Za-z]*)")  # to detect verse numbers
+verse_start = re.compile(r"^\s*(\d+[A-Z]?)\s*")
+chapter_verse_re = re.compile(r"^(\d+):(\d+)\s*(.*)")
+remove_punct = Normalizer(r"[^A-Za-z\s]")
+
+
+def split_verse_parts(line):
+    """Phase 1: drop headers/copyright and split a raw line at every verse number."""
+    stripped = line.strip()
+    if not stripped:
+        return []
+    if noise_classifier.classify(stripped)[0] != "text":
+        return []
+    return [part.strip() for part in verse_splitter.split(stripped) if part.strip()]
+
+
+def join_verse_lines(parts):
+    """Phase 2: merge parts into one `chapter:verse text` line per verse."""
     current_chapter = None
-
-    # --- Phase 1: read and split into verses ---
-    with open(in_file, "r", encoding="utf-8") as infile:
-        for line in infile:
-            stripped = line.strip()
-            if not stripped:
-                continue
-            if book_pattern.match(stripped):
-                continue
-            if copyright_pattern.match(stripped):
-                continue
-
-            parts = verse_splitter.split(stripped)
-            for part in parts:
-                if part.strip():
-                    cleaned_lines.append(part.strip())
-
-    # --- Phase 2: assemble Book / Chapter / Verse ---
-    data = []
-    book_list = ["Mateo", "Marcos", "Lucas"]
-    book_index = 0
-    current_book = book_list[book_index]
-    last_chapter = None
-    verse_start = re.compile(r"^\s*(\d+[A-Z]?)\s*")
-
-    final_lines = []
     current_verse = None
 
-    for line in cleaned_lines:
-        line = line.strip()
-        if not line:
-            continue
-
+    for line in parts:
         # Fix nC → n C
         line = re.sub(r"(\d)([A-Z])", r"\1 \2", line)
 
@@ -65,7 +56,7 @@ def clean_and_convert_bible(in_file, excel_out, sentences_out):
             if current_chapter:
                 line = f"{current_chapter}:{verse_number} " + line[m.end():].lstrip()
             if current_verse:
-                final_lines.append(current_verse.strip())
+                yield current_verse.strip()
             current_verse = line
         else:
             if current_verse:
@@ -74,49 +65,47 @@ def clean_and_convert_bible(in_file, excel_out, sentences_out):
                 current_verse = line
 
     if current_verse:
-        final_lines.append(current_verse.strip())
-
-    # --- Phase 3: clean and structure data ---
-    texts = []
-    for line in final_lines:
-        m = re.match(r"^(\d+):(\d+)\s*(.*)", line)
-        if m:
+        yield current_verse.strip()
+
+
+class ChavacanoParser(BibleParser):
+    """Running prose with inline verse numbers and lone chapter numbers."""
+
+    language = "chavacano"
+    raw_file = "chavacano_bible.txt"
+    excel_file = "chavacano_bible_cleaned.xlsx"
+    sentences_file = "chavacano_sentences.txt"
+    normalizer = remove_punct  # Remove punctuation
+    # Segmented texts (1 per line)
+    segmenter = Segmenter(keep_empty=True)
+    # Blank lines, page headers and the copyright line
+    noise_re = rf"|{book_line}|{copyright_line}"
+    canon = True  # chapter resets follow self.books
+
+    def classify(self, line):
+        return split_verse_parts(line)
+
+    def assemble(self, items):
+        # --- Phase 3: structure Book / Chapter / Verse ---
+        books = BookTracker(self.books)
+        names = dict(zip(self.books, header_names("chavacano", self.books)))
+
+        parts = (part for line_parts in items for part in line_parts)
+        for line in join_verse_lines(parts):
+            m = chapter_verse_re.match(line)
+            if not m:
+                # Skip lines without chapter or verse
+                continue
             chapter, verse, text = m.groups()
 
-            # Detect new book by reset to chapter 1
-            if last_chapter is not None and chapter == "1" and last_chapter != "1":
-                if book_index + 1 < len(book_list):
-                    book_index += 1
-                    current_book = book_list[book_index]
-
-            last_chapter = chapter
-
-            # Remove punctuation
-            text = re.sub(r"[^A-Za-z\s]", "", text).strip()
-            data.append([current_book, chapter, verse, text])
-            texts.append(text)
-        else:
-            # Skip lines without chapter or verse
-            continue
-
-    # --- Phase 4: write results ---
-    excel_out.parent.mkdir(parents=True, exist_ok=True)
-
-    # Save to Excel (Book, Chapter, Verse, Text)
-    df = pd.DataFrame(data, columns=["Book", "Chapter", "Verse", "Text"])
-
-    # Filter out any row without Chapter or Verse just in case
-    df = df[(df["Chapter"] != "") & (df["Verse"] != "")]
-
-    df.to_excel(excel_out, index=False)
+            # New book when the chapter resets to 1; the running page
+            # headers name a book only after its first page, so they are
+            # no help here
+            current_book = names[books.step(int(chapter), int(verse))]
+            yield Verse(current_book, chapter, verse, text)
 
-    # Save segmented texts (1 per line)
-    with open(sentences_out, "w", encoding="utf-8") as f:
-        for t in texts:
-            f.write(t + "\n")
 
-    print(f"Excel saved to: {excel_out}")
-    print(f"Texts saved to: {sentences_out}")
+PARSER = ChavacanoParser()
 
-# Run the cleaner
-clean_and_convert_bible(input_file, excel_output, sentences_output)
+if __name__ == "__main__":
+    main(PARSER)
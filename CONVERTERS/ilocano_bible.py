@@ -1,32 +1,65 @@
 import re
+import sys
 from pathlib import Path
-import pandas as pd
-
-def clean_bible_text_to_excel():
-    # keep original paths
-    input_file = Path("RAW_FILES/ilocano_bible.txt")
-    output_file_excel = Path("CONVERTED_FILES/ilocano_bible_cleaned.xlsx")
-    output_file_sentences = Path("CONVERTED_FILES/ilocano_sentences.txt")
-
-    current_book = None
-    current_chapter = None
-    rows = []
-    sentences = []
-    verse_block = ""
-
-    def process_verse_block(block, book, chapter):
-        """Process a full verse block (may contain ranges or 6a/6b)."""
-        if not block.strip():
-            return
-
-        block = block.strip()
-
-        # Handle ranges like 2-6a, 6b-11, 12-16
-        range_match = re.match(r"^(\d+)([ab]?)-(\d+)([ab]?)(.*)", block)
-        if range_match:
-            start, start_letter, end, end_letter, verse_text = range_match.groups()
-            start, end = int(start), int(end)
-            verse_text = verse_text.strip()
+
+base_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(base_dir))
+
+from PIPELINE.books import header_pattern
+from PIPELINE.engine import BibleParser, Verse, main
+from PIPELINE.line_classifier import LineClassifier
+from PIPELINE.normalizer import Normalizer
+from PIPELINE.segmenter import Segmenter
+
+paren_re = re.compile(r"\([^)]*\)")
+# Split verse text into sentences
+sentence_punct = Normalizer(r"[^\w\s.!?]")
+sentence_split_re = re.compile(r"[.!?]")
+
+# Checked in this order; anything else continues the previous verse
+verse_rules = [
+    # Book + chapter lines
+    ("book", rf"(?P<book>{header_pattern('ilocano')})\s+(?P<chapter>\d+)"),
+    # Ranges like 2-6a, 6b-11, 12-16
+    ("range", r"(?P<start>\d+)(?P<start_letter>[ab]?)-(?P<end>\d+)(?P<end_letter>[ab]?)(?P<text>.*)"),
+    # Single lettered verse like 6a/6b
+    ("lettered", r"(?P<number>\d+[a-z])(?P<text>.*)"),
+    ("verse", r"(?P<number>\d+)\s*(?P<text>.*)"),
+]
+# Blank lines and lines that are only numbers
+line_classifier = LineClassifier([("skip", r"\d*$")] + verse_rules)
+ref_line_classifier = LineClassifier(verse_rules)
+
+
+class IlocanoParser(BibleParser):
+    """`San Mateo 1` headers, verses glued to numbers, ranges like `2-6a` and `6b-11`."""
+
+    language = "ilocano"
+    raw_file = "ilocano_bible.txt"
+    excel_file = "ilocano_bible_cleaned.xlsx"
+    sentences_file = "ilocano_sentences.txt"
+    segmenter = Segmenter(sentence_split_re)
+    columns = ["Book", "Verse", "Sentence"]
+
+    # Blank lines and page numbers
+    noise_re = r"\d*"
+    shard_re = rf"{header_pattern('ilocano')}\s+\d"
+
+    def classify(self, line):
+        stripped = line.strip()
+        # Remove parentheses
+        if "(" in stripped:
+            return ref_line_classifier.classify(paren_re.sub("", stripped).strip())
+        return line_classifier.classify(stripped)
+
+    def process_verse_block(self, kind, fields, text, book, chapter):
+        """Verses for a block opened by a `kind` line (may be a range or 6a/6b)."""
+        verse_text = text.strip()
+
+        if kind == "range":
+            start, end = int(fields["start"]), int(fields["end"])
+            start_letter, end_letter = fields["start_letter"], fields["end_letter"]
+            labels = []
             for v in range(start, end + 1):
                 verse_label = f"{v}"
                 if v == 6 and (start_letter or end_letter):
@@ -34,83 +67,59 @@ def clean_bible_text_to_excel():
                         verse_label = "6a"
                     elif start_letter == 'b' or end_letter == 'b':
                         verse_label = "6b"
-
-                rows.append({"Book": book, "Verse": f"{chapter}:{verse_label}", "Sentence": verse_text})
-                split_sentences(verse_text)
-            return
-
-        # Handle single lettered verse like 6a/6b
-        lettered_match = re.match(r"^(\d+[a-z])(.*)", block)
-        if lettered_match:
-            v, verse_text = lettered_match.groups()
-            verse_text = verse_text.strip()
-            rows.append({"Book": book, "Verse": f"{chapter}:{v}", "Sentence": verse_text})
-            split_sentences(verse_text)
-            return
-
-        # Normal single verse with number
-        number_match = re.match(r"^(\d+)\s*(.*)", block)
-        if number_match:
-            v, verse_text = number_match.groups()
-            verse_text = verse_text.strip()
-            rows.append({"Book": book, "Verse": f"{chapter}:{v}", "Sentence": verse_text})
-            split_sentences(verse_text)
-
-    def split_sentences(text):
-        """Split verse text into sentences and add them to the list."""
-        clean_text = re.sub(r"[^\w\s.!?]", "", text)
-        for sentence in re.split(r'[.!?]', clean_text):
-            s = sentence.strip()
-            if s:
-                sentences.append(s)
-
-    with open(input_file, "r", encoding="utf-8") as infile:
-        for line in infile:
-            stripped = line.strip()
-            if not stripped:
-                continue
-
-            # Skip lines that are only numbers
-            if stripped.isdigit():
+                labels.append(verse_label)
+            # One entry for the whole range
+            if labels:
+                yield Verse(book, chapter, labels[0], verse_text, verses=tuple(labels))
+        elif kind in ("lettered", "verse"):
+            yield Verse(book, chapter, fields["number"], verse_text)
+        # Text before the first verse number is dropped
+
+    def assemble(self, items):
+        current_book = None
+        current_chapter = None
+        # The line that opened the current block, and the block's text so far
+        block_kind, block_fields, block_text = None, None, None
+
+        for kind, fields in items:
+            if kind == "skip":
                 continue
 
-            # Remove parentheses
-            no_refs = re.sub(r"\([^)]*\)", "", stripped).strip()
-
-            # Detect book + chapter lines
-            book_chapter_match = re.match(r"^(San Mateo|San Lucas|San Marcos)\s+(\d+)", no_refs)
-            if book_chapter_match:
-                if verse_block:
-                    process_verse_block(verse_block, current_book, current_chapter)
-                verse_block = ""
-                current_book, current_chapter = book_chapter_match.groups()
+            if kind == "book":
+                if block_kind:
+                    yield from self.process_verse_block(block_kind, block_fields, block_text,
+                                                        current_book, current_chapter)
+                block_kind = None
+                current_book, current_chapter = fields["book"], fields["chapter"]
                 continue
 
             # Start of a new verse
-            if re.match(r"^\d", no_refs):
-                if verse_block:
-                    process_verse_block(verse_block, current_book, current_chapter)
-                verse_block = no_refs
-            else:
+            if kind != "text":
+                if block_kind:
+                    yield from self.process_verse_block(block_kind, block_fields, block_text,
+                                                        current_book, current_chapter)
+                block_kind, block_fields, block_text = kind, fields, fields["text"]
+            elif block_kind:
                 # Continuation of previous verse
-                verse_block += " " + no_refs
+                block_text += " " + fields["text"]
+            else:
+                block_kind, block_fields, block_text = "text", fields, fields["text"]
+
+        # Process any remaining block
+        if block_kind:
+            yield from self.process_verse_block(block_kind, block_fields, block_text,
+                                                current_book, current_chapter)
 
-    # Process any remaining block
-    if verse_block:
-        process_verse_block(verse_block, current_book, current_chapter)
+    def segment(self, raw, cleaned):
+        # Only the sentences lose their punctuation; the verse text is stored as is
+        text = sentence_punct(cleaned.text)
+        return text, self.segmenter.spans(text)
 
-    # --- Save Excel ---
-    output_file_excel.parent.mkdir(parents=True, exist_ok=True)
-    df = pd.DataFrame(rows, columns=["Book", "Verse", "Sentence"])
-    df.to_excel(output_file_excel, index=False)
+    def to_rows(self, verse):
+        yield [verse.book, f"{verse.chapter}:{verse.verse}", verse.text]
 
-    # --- Save sentences file ---
-    with open(output_file_sentences, "w", encoding="utf-8") as sfile:
-        for s in sentences:
-            sfile.write(s + "\n")
 
-    print(f"Excel file saved -> {output_file_excel}")
-    print(f"Sentences file saved -> {output_file_sentences}")
+PARSER = IlocanoParser()
 
 if __name__ == "__main__":
-    clean_bible_text_to_excel()
+    main(PARSER)
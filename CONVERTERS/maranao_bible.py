@@ -1,145 +1,122 @@
 import re
+import sys
 from pathlib import Path
-import pandas as pd
-
-def clean_maranao_bible():
-    input_file = Path("RAW_FILES/maranao.txt")
-    output_file_excel = Path("CONVERTED_FILES/maranao_bible_cleaned.xlsx")
-    output_file_sentences = Path("CONVERTED_FILES/maranao_sentences.txt")
-
-    current_book = None
-    current_chapter = None
-    current_verse_num = None
-    current_verse_text = ""
-    saw_new_chapter = False
-
-    rows = []
-    sentences = []
-
-    book_chapter_re = re.compile(r"^(MATIYO|MARKO|LOKAS)\s+(\d+)\b", re.IGNORECASE)
-    verse_range_re = re.compile(r"^(\d+)-(\d+)\s*(.*)$")
-    verse_start_re = re.compile(r"^(\d+)(?:[\.:])?\s*(.*)$")
-    remove_paren_re = re.compile(r"\([^)]*\)")
-    remove_tags_re = re.compile(r"<[^>]+>")
-    remove_punct_re = re.compile(r"[,:;!?\"“”]")
-
-    def split_sentences(text):
-        clean_text = re.sub(r"[^\w\s.!?]", "", text)
-        for s in re.split(r"[.!?]", clean_text):
-            s = s.strip()
-            if s:
-                sentences.append(s)
-
-    with open(input_file, "r", encoding="utf-8") as f:
-        for raw_line in f:
-            line = raw_line.strip()
-            if not line:
-                continue
 
-            text = remove_paren_re.sub("", line)
-            text = remove_tags_re.sub("", text)
-            text = remove_punct_re.sub("", text)
-            text = re.sub(r"\s+", " ", text).strip()
-            if not text:
+base_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(base_dir))
+
+from PIPELINE.books import header_pattern
+from PIPELINE.engine import BibleParser, Verse, main
+from PIPELINE.line_classifier import LineClassifier
+from PIPELINE.normalizer import Normalizer
+from PIPELINE.segmenter import Segmenter
+
+# Checked in this order on the cleaned line; anything else is verse text
+line_classifier = LineClassifier([
+    ("book", rf"(?P<book>{header_pattern('maranao')})\s+(?P<chapter>\d+)\b"),
+    ("range", r"(?P<start>\d+)-(?P<end>\d+)\s*(?P<text>.*)$"),
+    ("verse", r"(?P<number>\d+)(?:[\.:])?\s*(?P<text>.*)$"),
+], flags=re.IGNORECASE)
+remove_paren_re = re.compile(r"\([^)]*\)")
+remove_tags_re = re.compile(r"<[^>]+>")
+remove_punct = Normalizer(r"[,:;!?\"“”]", squeeze=True)
+sentence_punct = Normalizer(r"[^\w\s.!?]")
+sentence_split_re = re.compile(r"[.!?]")
+
+
+class MaranaoParser(BibleParser):
+    """`MATIYO 1` headers; verse 1 is usually unnumbered, ranges as `n1-n2`."""
+
+    language = "maranao"
+    raw_file = "maranao.txt"
+    excel_file = "maranao_bible_cleaned.xlsx"
+    sentences_file = "maranao_sentences.txt"
+    segmenter = Segmenter(sentence_split_re)
+
+    noise_re = ""  # blank lines
+    shard_re = rf"(?i:{header_pattern('maranao')})\s+\d"
+
+    def classify(self, line):
+        line = line.strip()
+        if not line:
+            return None
+
+        text = remove_paren_re.sub("", line)
+        text = remove_tags_re.sub("", text)
+        text = remove_punct(text)
+        return line_classifier.classify(text) if text else None
+
+    def assemble(self, items):
+        current_book = None
+        current_chapter = None
+        current_verse_num = None
+        current_verse_text = ""
+        saw_new_chapter = False
+
+        for item in items:
+            if item is None:
                 continue
+            kind, fields = item
 
-            m_book = book_chapter_re.match(text)
-            if m_book:
+            if kind == "book":
                 if current_verse_text:
-                    rows.append({
-                        "Book": current_book,
-                        "ChapterVerse": f"{current_chapter}:{current_verse_num}",
-                        "Text": current_verse_text.strip()
-                    })
-                    split_sentences(current_verse_text)
+                    yield Verse(current_book, current_chapter, current_verse_num, current_verse_text.strip())
                     current_verse_text = ""
                     current_verse_num = None
 
-                book_tok, chap_tok = m_book.groups()
-                current_book = book_tok.capitalize()
-                current_chapter = chap_tok
+                current_book = fields["book"].capitalize()
+                current_chapter = fields["chapter"]
                 saw_new_chapter = True
                 continue
 
             if saw_new_chapter:
-                if not re.match(r"^\d+", text):
+                saw_new_chapter = False
+                if kind == "text":
                     current_verse_num = "1"
-                    current_verse_text = text
-                    saw_new_chapter = False
+                    current_verse_text = fields["text"]
                     continue
-                else:
-                    saw_new_chapter = False
 
-            m_range = verse_range_re.match(text)
-            if m_range:
-                n1, n2, verse_text = m_range.groups()
-                verse_text = verse_text.strip()
+            if kind == "range":
+                n1, n2 = fields["start"], fields["end"]
+                verse_text = fields["text"].strip()
                 if current_verse_text:
-                    rows.append({
-                        "Book": current_book,
-                        "ChapterVerse": f"{current_chapter}:{current_verse_num}",
-                        "Text": current_verse_text.strip()
-                    })
-                    split_sentences(current_verse_text)
+                    yield Verse(current_book, current_chapter, current_verse_num, current_verse_text.strip())
                     current_verse_text = ""
                     current_verse_num = None
 
-                for n in (n1, n2):
-                    rows.append({
-                        "Book": current_book,
-                        "ChapterVerse": f"{current_chapter}:{n}",
-                        "Text": verse_text
-                    })
-                    split_sentences(verse_text)
+                verses = tuple(str(n) for n in range(int(n1), int(n2) + 1))
+                yield Verse(current_book, current_chapter, n1, verse_text, verses=verses)
                 continue
 
-            m_vs = verse_start_re.match(text)
-            if m_vs:
-                verse_num, after = m_vs.groups()
-                after = after.strip()
+            if kind == "verse":
+                verse_num, after = fields["number"], fields["text"]
                 if current_verse_text:
-                    rows.append({
-                        "Book": current_book,
-                        "ChapterVerse": f"{current_chapter}:{current_verse_num}",
-                        "Text": current_verse_text.strip()
-                    })
-                    split_sentences(current_verse_text)
+                    yield Verse(current_book, current_chapter, current_verse_num, current_verse_text.strip())
                 current_verse_num = verse_num
-                current_verse_text = after
+                current_verse_text = after.strip()
                 continue
 
             if current_verse_text:
-                current_verse_text += " " + text
+                current_verse_text += " " + fields["text"]
             else:
                 current_verse_num = "1"
-                current_verse_text = text
-
-    if current_verse_text:
-        rows.append({
-            "Book": current_book,
-            "ChapterVerse": f"{current_chapter}:{current_verse_num}",
-            "Text": current_verse_text.strip()
-        })
-        split_sentences(current_verse_text)
+                current_verse_text = fields["text"]
 
-    # --- ✅ SPLIT ChapterVerse into two columns before saving ---
-    output_file_excel.parent.mkdir(parents=True, exist_ok=True)
-    df = pd.DataFrame(rows, columns=["Book", "ChapterVerse", "Text"])
+        if current_verse_text:
+            yield Verse(current_book, current_chapter, current_verse_num, current_verse_text.strip())
 
-    # Split "3:5" → Chapter=3, Verse=5
-    df[["Chapter", "Verse"]] = df["ChapterVerse"].str.split(":", n=1, expand=True)
+    def segment(self, raw, cleaned):
+        # Only the sentences lose their punctuation; the verse text is stored as is
+        text = sentence_punct(cleaned.text)
+        return text, self.segmenter.spans(text)
 
-    # Rearrange columns
-    df = df[["Book", "Chapter", "Verse", "Text"]]
-    df.to_excel(output_file_excel, index=False)
+    def to_rows(self, verse):
+        # Split "3:5" → Chapter=3, Verse=5
+        chapter, verse_num = f"{verse.chapter}:{verse.verse}".split(":", 1)
+        yield [verse.book, chapter, verse_num, verse.text]
 
-    # --- Save sentences ---
-    with open(output_file_sentences, "w", encoding="utf-8") as sf:
-        for s in sentences:
-            sf.write(s + "\n")
 
-    print(f"Excel file saved -> {output_file_excel}")
-    print(f"Sentence file saved -> {output_file_sentences}")
+PARSER = MaranaoParser()
 
 if __name__ == "__main__":
-    clean_maranao_bible()
+    main(PARSER)
@@ -1,67 +1,77 @@
 import re
+import sys
 from pathlib import Path
-import pandas as pd
 
 base_dir = Path(__file__).resolve().parent.parent
-input_file = base_dir / "RAW_FILES" / "pangansinan_bible.txt"
-cleaned_output = base_dir / "CONVERTED_FILES" / "pangansinan_bible_cleaned.txt"
-final_output = base_dir / "CONVERTED_FILES" / "pangansinan_bible_final.txt"
-excel_output = base_dir / "CONVERTED_FILES" / "pangansina_bible.xlsx"
-
-def clean_text(in_file, out_file):
-    cleaned_lines = []
-
-    # Match lines that contain only "Mateo", "Marcos", or "Lucas" with optional numbers/commas
-    book_pattern = re.compile(r"^\s*\d*\s*(Mateo|Marcos|Lucas)(?:[\s\d,]*)$")
-
-    # Match the copyright/source line (with or without final period)
-    copyright_pattern = re.compile(
-        r"^The New Testament in Chavacano of the Philippines;.*Wycliffe Bible Translators, Inc\.?$"
-    )
-
-    # Regex to split verses: handles digits with optional letters, at start or mid-line
-    verse_splitter = re.compile(r"(?=\b\d+[A-Za-z]*)")
-
-    with open(in_file, "r", encoding="utf-8") as infile:
-        for line in infile:
-            stripped = line.strip()
-
-            # Skip headers for Mateo, Marcos, or Lucas
-            if book_pattern.match(stripped):
-                continue
-            # Skip copyright/source notes
-            if copyright_pattern.match(stripped):
-                continue
-
-            if stripped:
-                # Split the line into verses
-                parts = verse_splitter.split(stripped)
-                for part in parts:
-                    if part.strip():
-                        cleaned_lines.append(part.strip())
-
-    with open(out_file, "w", encoding="utf-8") as outfile:
-        outfile.write("\n".join(cleaned_lines))
-
-
-def prepare_final(in_file, out_file):
-    """
-    Merge lines for each verse so that each verse is on one line.
-    Fix nC → n C.
-    Convert lone chapter numbers to prefix verses as chapter:verse.
-    Also creates an Excel file with book, chapter:verse, sentence.
-    """
-    verse_start = re.compile(r"^\s*(\d+[A-Z]?)\s*")  # detect verse numbers
-    final_lines = []
-    current_verse = None
-    current_chapter = None
-
-    with open(in_file, "r", encoding="utf-8") as infile:
-        for line in infile:
-            line = line.strip()
-            if not line:
-                continue
-
+sys.path.insert(0, str(base_dir))
+
+from PIPELINE.books import header_names, header_pattern
+from PIPELINE.engine import BibleParser, TextSink, Verse, main
+
+# Match lines that contain only "Mateo", "Marcos", or "Lucas" with optional numbers/commas
+book_line = rf"\d*\s*({header_pattern('pangasinan')})(?:[\s\d,]*)"
+book_pattern = re.compile(rf"^\s*{book_line}$")
+
+# Match the copyright/source line (with or without final period)
+copyright_line = r"The New Testament in Chavacano of the Philippines;.*Wycliffe Bible Translators, Inc\.?"
+copyright_pattern = re.compile(rf"^{copyright_line}$")
+
+# Regex to split verses: handles digits with optional letters, at start or mid-line
+verse_splitter = re.compile(r"(?=\b\d+[A-Za-z]*)")
+
+verse_start = re.compile(r"^\s*(\d+[A-Z]?)\s*")  # detect verse numbers
+chapter_verse_re = re.compile(r"^(\d+):(\d+)")
+
+
+class PangasinanParser(BibleParser):
+    """Same running-prose layout as Chavacano, split into verses in one streaming pass."""
+
+    language = "pangasinan"
+    raw_file = "pangansinan_bible.txt"
+    excel_file = "pangansinan_bible_final.xlsx"
+    columns = ["book", "chapter:verse", "sentence"]
+
+    # Blank lines, page headers and the copyright line
+    noise_re = rf"|{book_line}|{copyright_line}"
+
+    # The split lines and the merged verse lines, only written with --dump
+    cleaned_file = "pangansinan_bible_cleaned.txt"
+    final_file = "pangansinan_bible_final.txt"
+    cleaned_dump = final_dump = None
+
+    def open(self, output_dir):
+        self.cleaned_dump = self.final_dump = None
+        if self.dump:
+            self.cleaned_dump = TextSink(output_dir / self.cleaned_file, trailing_newline=False)
+            self.final_dump = TextSink(output_dir / self.final_file, trailing_newline=False)
+
+    def close(self):
+        for dump in (self.cleaned_dump, self.final_dump):
+            if dump is not None:
+                dump.close()
+
+    def classify(self, line):
+        """Skip book headers and copyright notes, split the line into verses."""
+        stripped = line.strip()
+        if not stripped or book_pattern.match(stripped) or copyright_pattern.match(stripped):
+            return []
+
+        parts = [part.strip() for part in verse_splitter.split(stripped) if part.strip()]
+        if self.cleaned_dump is not None:
+            for part in parts:
+                self.cleaned_dump.write(part)
+        return parts
+
+    def verse_lines(self, parts):
+        """
+        Merge lines for each verse so that each verse is on one line.
+        Fix nC → n C.
+        Convert lone chapter numbers to prefix verses as chapter:verse.
+        """
+        current_verse = None
+        current_chapter = None
+
+        for line in parts:
             # Fix nC → n C anywhere in the line
             line = re.sub(r"(\d)([A-Z])", r"\1 \2", line)
 
@@ -79,7 +89,7 @@ def prepare_final(in_file, out_file):
                     line = f"{current_chapter}:{verse_number} " + line[m.end():].lstrip()
                 # save previous verse
                 if current_verse:
-                    final_lines.append(current_verse.strip())
+                    yield current_verse.strip()
                 current_verse = line
             else:
                 if current_verse:
@@ -89,25 +99,27 @@ def prepare_final(in_file, out_file):
 
         # Save last verse
         if current_verse:
-            final_lines.append(current_verse.strip())
-
-    # Write cleaned final text
-    with open(out_file, "w", encoding="utf-8") as outfile:
-        outfile.write("\n".join(final_lines))
-
-    # --- Create Excel file ---
-    data = []
-    book_list = ["Mateo", "Marcos", "Lucas"]
-    book_index = 0
-    current_book = book_list[book_index]
-    last_chapter = None  # track previous chapter to detect reset
-
-    for line in final_lines:
-        # Extract chapter:verse prefix
-        m = re.match(r"^(\d+):(\d+)", line)
-        if m:
+            yield current_verse.strip()
+
+    def assemble(self, items):
+        book_list = header_names("pangasinan")
+        book_index = 0
+        current_book = book_list[book_index]
+        last_chapter = None  # track previous chapter to detect reset
+
+        parts = (part for line_parts in items for part in line_parts)
+        for line in self.verse_lines(parts):
+            if self.final_dump is not None:
+                self.final_dump.write(line)
+
+            # Extract chapter:verse prefix
+            m = chapter_verse_re.match(line)
+            if not m:
+                # If no verse prefix, just add as is
+                yield Verse(current_book, None, None, line)
+                continue
+
             chapter, verse = m.groups()
-            sentence = line[m.end():].strip()
 
             # Detect new book: chapter goes back to 1 after the first book
             if last_chapter is not None and chapter == "1" and last_chapter != "1":
@@ -116,17 +128,14 @@ def prepare_final(in_file, out_file):
                     current_book = book_list[book_index]
 
             last_chapter = chapter
-            ref = f"{chapter}:{verse}"
-            data.append([current_book, ref, sentence])
-        else:
-            # If no verse prefix, just add as is
-            data.append([current_book, "", line])
-
-    # Save to Excel
-    excel_path = out_file.with_suffix(".xlsx")
-    df = pd.DataFrame(data, columns=["book", "chapter:verse", "sentence"])
-    df.to_excel(excel_path, index=False)
-
-# Execute sequentially
-clean_text(input_file, cleaned_output)
-prepare_final(cleaned_output, final_output)
+            yield Verse(current_book, chapter, verse, line[m.end():].strip())
+
+    def to_rows(self, verse):
+        ref = f"{verse.chapter}:{verse.verse}" if verse.chapter is not None else ""
+        yield [verse.book, ref, verse.text]
+
+
+PARSER = PangasinanParser()
+
+if __name__ == "__main__":
+    main(PARSER)
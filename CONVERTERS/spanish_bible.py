@@ -1,77 +1,68 @@
 import re
-import pandas as pd
+import sys
 from pathlib import Path
 
 # === BASE DIRECTORIES ===
 base_dir = Path(__file__).resolve().parent.parent  # project root
-input_file = base_dir / "RAW_FILES" / "spanish_bible.txt"
-output_folder = base_dir / "CONVERTED_FILES"
-output_folder.mkdir(parents=True, exist_ok=True)
+sys.path.insert(0, str(base_dir))
 
-excel_path = output_folder / "spanish_bible_cleaned.xlsx"
-txt_path = output_folder / "spanish_by_sentence.txt"  # <-- fixed
+from PIPELINE.books import BookTracker, book_header, book_name, header_pattern
+from PIPELINE.engine import BibleParser, Verse, main
+from PIPELINE.normalizer import Normalizer
+from PIPELINE.segmenter import Segmenter
 
-def remove_punctuation(text: str) -> str:
-    return re.sub(r"[^\w\sáéíóúüñÁÉÍÓÚÜÑ]", "", text)
+line_re = re.compile(r"^(\d+):(\d+)\s+(.*)$")
+# Remove punctuation and normalize spaces
+remove_punctuation = Normalizer(r"[^\w\sáéíóúüñÁÉÍÓÚÜÑ]", squeeze=True)
 
-def clean_spanish_bible():
-    verse_rows = []
-    all_sentences = []
 
-    line_re = re.compile(r"^(\d+):(\d+)\s+(.*)$")
+class SpanishParser(BibleParser):
+    """`chapter:verse text` lines; books are told apart by the chapter resetting to 1."""
 
-    # Book tracking
-    book_order = ["Matthew", "Mark", "Luke"]
-    current_book_index = 0
-    current_book = book_order[current_book_index]
-    last_chapter = 0
+    language = "spanish"
+    raw_file = "spanish_bible.txt"
+    excel_file = "spanish_bible_cleaned.xlsx"
+    sentences_file = "spanish_by_sentence.txt"
+    sentences_trailing_newline = False
+    normalizer = remove_punctuation
+    # Sentences TXT (1 per line)
+    segmenter = Segmenter(keep_empty=True)
 
-    with open(input_file, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
+    noise_re = ""  # blank lines
+    canon = True  # book headers and chapter resets follow self.books
+    # A whole-Bible file can be cut at its book header lines
+    shard_re = header_pattern("spanish")
+
+    def is_shard_start(self, line):
+        return isinstance(self.classify(line), int)
+
+    def classify(self, line):
+        line = line.strip()
+        # A book header line ("Génesis") in a whole-Bible file gives its id
+        return line_re.match(line) or book_header(line)
 
-            m = line_re.match(line)
+    def assemble(self, items):
+        # Book tracking: explicit headers, else chapter reset → new book
+        books = BookTracker(self.books)
+
+        for m in items:
             if not m:
                 continue
+            if isinstance(m, int):
+                books.header(m)
+                continue
 
             chapter, verse, text = m.groups()
             chapter = int(chapter)
             verse = int(verse)
-
-            # Detect chapter reset → new book
-            if chapter == 1 and last_chapter > 1:
-                current_book_index += 1
-                if current_book_index < len(book_order):
-                    current_book = book_order[current_book_index]
-
-            last_chapter = chapter
-
-            # Remove punctuation and normalize spaces
-            text = remove_punctuation(text)
-            text = re.sub(r"\s+", " ", text).strip()
+            current_book = book_name(books.step(chapter, verse))
 
             # Only save if chapter and verse exist
             if chapter and verse:
-                verse_rows.append({
-                    "Book": current_book,
-                    "Chapter": chapter,
-                    "Verse": verse,
-                    "Text": text
-                })
-                all_sentences.append(text)
-
-    # Save Excel by verse
-    df = pd.DataFrame(verse_rows)
-    df.to_excel(excel_path, index=False)
-    print(f"Saved Excel -> {excel_path}")
+                yield Verse(current_book, chapter, verse, text)
 
-    # Save sentences TXT (1 per line)
-    with open(txt_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(all_sentences))
-    print(f"Saved Sentences TXT -> {txt_path}")
 
+PARSER = SpanishParser()
 
 if __name__ == "__main__":
-    clean_spanish_bible()
+    main(PARSER)
@@ -1,129 +1,109 @@
 import re
+import sys
 from pathlib import Path
-import pandas as pd
-
-def clean_bible_text_to_excel():
-    input_file = Path("RAW_FILES/waray_waray_bible.txt")
-    output_file_excel = Path("CONVERTED_FILES/waray_waray_bible_cleaned.xlsx")
-    output_file_sentences = Path("CONVERTED_FILES/waray_waray_sentences.txt")
-
-    current_book = None
-    current_chapter = None
-    rows = []
-    sentences = []
-    verse_block = ""
-
-    def process_verse_block(block, book, chapter):
-        if not block or not block.strip():
-            return
-        sblock = block.strip()
-
-        # Handle ranges like 2-6a, 6b-11, 12-16
-        range_match = re.match(r"^(\d+)([ab]?)-(\d+)([ab]?)(.*)", sblock)
-        if range_match:
-            start, start_letter, end, end_letter, verse_text = range_match.groups()
-            start, end = int(start), int(end)
-            verse_text = (verse_text or "").strip()
-            for v in range(start, end + 1):
-                rows.append({"Book": book, "Chapter": chapter, "Verse": v, "Sentence": verse_text})
-                sentences.append(verse_text)
-            return
-
-        # Single-lettered verse like 6a / 6b
-        lettered_match = re.match(r"^(\d+)([a-zA-Z])\s*(.*)", sblock)
-        if lettered_match:
-            num, letter, verse_text = lettered_match.groups()
-            verse_text = (verse_text or "").strip()
-            # ✅ Move the letter into the sentence
-            full_sentence = f"{letter} {verse_text}".strip()
-            rows.append({"Book": book, "Chapter": chapter, "Verse": num, "Sentence": full_sentence})
-            sentences.append(full_sentence)
-            return
-
-        # Normal single verse
-        number_match = re.match(r"^(\d+)\s*(.*)", sblock)
-        if number_match:
-            v, verse_text = number_match.groups()
-            verse_text = (verse_text or "").strip()
-            rows.append({"Book": book, "Chapter": chapter, "Verse": v, "Sentence": verse_text})
-            sentences.append(verse_text)
-            return
-
-        # Fallback
-        rows.append({"Book": book, "Chapter": chapter, "Verse": "", "Sentence": sblock})
-        sentences.append(sblock)
-
-    # === Read & parse ===
-    with open(input_file, "r", encoding="utf-8") as infile:
-        for raw in infile:
-            stripped = raw.strip()
-            if not stripped:
-                continue
 
-            if stripped.isdigit():
+base_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(base_dir))
+
+from PIPELINE.books import header_pattern
+from PIPELINE.engine import BibleParser, Verse, main
+from PIPELINE.line_classifier import LineClassifier
+from PIPELINE.segmenter import Segmenter
+
+paren_re = re.compile(r"\([^)]*\)")
+
+# Checked in this order; anything else continues the previous verse
+verse_rules = [
+    # Book + chapter lines
+    ("book", rf"(?P<book>{header_pattern('waray_waray')})\s+(?P<chapter>\d+)"),
+    # Ranges like 2-6a, 6b-11, 12-16
+    ("range", r"(?P<start>\d+)(?P<start_letter>[ab]?)-(?P<end>\d+)(?P<end_letter>[ab]?)(?P<text>.*)"),
+    # Single-lettered verse like 6a / 6b
+    ("lettered", r"(?P<number>\d+)(?P<letter>[a-zA-Z])\s*(?P<text>.*)"),
+    ("verse", r"(?P<number>\d+)\s*(?P<text>.*)"),
+]
+# Blank lines and lines that are only numbers
+line_classifier = LineClassifier([("skip", r"\d*$")] + verse_rules)
+ref_line_classifier = LineClassifier(verse_rules)
+
+
+class WarayParser(BibleParser):
+    """`Mateo 1` headers, verses glued to numbers, ranges like `2-6a` and `6b-11`."""
+
+    language = "waray_waray"
+    raw_file = "waray_waray_bible.txt"
+    excel_file = "waray_waray_bible_cleaned.xlsx"
+    sentences_file = "waray_waray_sentences.txt"
+    segmenter = Segmenter(keep_empty=True)
+    columns = ["Book", "Chapter", "Verse", "Sentence"]
+
+    # Blank lines and page numbers
+    noise_re = r"\d*"
+    shard_re = rf"{header_pattern('waray_waray')}\s+\d"
+
+    def classify(self, line):
+        stripped = line.strip()
+        # Remove parenthetical refs
+        if "(" in stripped:
+            return ref_line_classifier.classify(paren_re.sub("", stripped).strip())
+        return line_classifier.classify(stripped)
+
+    def process_verse_block(self, kind, fields, text, book, chapter):
+        """Verses for a block opened by a `kind` line with `fields`, whose text is `text`."""
+        verse_text = text.strip()
+        if kind == "range":
+            verses = tuple(range(int(fields["start"]), int(fields["end"]) + 1))
+            if verses:
+                yield Verse(book, chapter, verses[0], verse_text, verses=verses)
+        elif kind == "lettered":
+            # ✅ Move the letter into the sentence
+            yield Verse(book, chapter, fields["number"], f"{fields['letter']} {verse_text}".strip())
+        elif kind == "verse":
+            yield Verse(book, chapter, fields["number"], verse_text)
+        elif verse_text:
+            # Fallback: text before the first verse number
+            yield Verse(book, chapter, "", verse_text)
+
+    def assemble(self, items):
+        current_book = None
+        current_chapter = None
+        # The line that opened the current block, and the block's text so far
+        block_kind, block_fields, block_text = None, None, None
+
+        for kind, fields in items:
+            if kind == "skip":
                 continue
 
-            # Remove parenthetical refs
-            no_refs = re.sub(r"\([^)]*\)", "", stripped)
-            no_punct = no_refs.strip()
-
-            # Detect book+chapter lines
-            book_chapter_match = re.match(r"^(Mateo|Lucas|Marcos)\s+(\d+)", no_punct)
-            if book_chapter_match:
-                if verse_block:
-                    process_verse_block(verse_block, current_book, current_chapter)
-                verse_block = ""
-                current_book, current_chapter = book_chapter_match.groups()
+            if kind == "book":
+                if block_kind:
+                    yield from self.process_verse_block(block_kind, block_fields, block_text,
+                                                        current_book, current_chapter)
+                block_kind = None
+                current_book, current_chapter = fields["book"], fields["chapter"]
                 continue
 
             # Start of a new verse
-            if re.match(r"^\d", no_punct):
-                if verse_block:
-                    process_verse_block(verse_block, current_book, current_chapter)
-                verse_block = no_punct
+            if kind != "text":
+                if block_kind:
+                    yield from self.process_verse_block(block_kind, block_fields, block_text,
+                                                        current_book, current_chapter)
+                block_kind, block_fields, block_text = kind, fields, fields["text"]
+            elif block_kind:
+                block_text += " " + fields["text"]
             else:
-                verse_block += " " + no_punct
-
-    # Process leftover block
-    if verse_block:
-        process_verse_block(verse_block, current_book, current_chapter)
-
-    # === Normalize before Excel ===
-    normalized = []
-    for r in rows:
-        book = r.get("Book", "") or ""
-        sentence = r.get("Sentence", "") or ""
-        chap = r.get("Chapter", "")
-        verse = r.get("Verse", "")
-
-        if isinstance(verse, str) and ":" in verse:
-            parts = verse.split(":", 1)
-            if parts:
-                if not chap:
-                    chap = parts[0]
-                verse = parts[1]
-
-        normalized.append({
-            "Book": str(book),
-            "Chapter": str(chap),
-            "Verse": str(verse),
-            "Sentence": str(sentence)
-        })
-
-    # Ensure output folder exists
-    output_file_excel.parent.mkdir(parents=True, exist_ok=True)
-
-    # Save Excel
-    df = pd.DataFrame(normalized, columns=["Book", "Chapter", "Verse", "Sentence"])
-    df.to_excel(output_file_excel, index=False)
-
-    # Save sentences
-    with open(output_file_sentences, "w", encoding="utf-8") as sf:
-        for s in sentences:
-            sf.write((s or "").strip() + "\n")
-
-    print(f"Saved Excel -> {output_file_excel}")
-    print(f"Saved sentences -> {output_file_sentences}")
-
-# Run
-clean_bible_text_to_excel()
+                block_kind, block_fields, block_text = "text", fields, fields["text"]
+
+        # Process leftover block
+        if block_kind:
+            yield from self.process_verse_block(block_kind, block_fields, block_text,
+                                                current_book, current_chapter)
+
+    def to_rows(self, verse):
+        # === Normalize before Excel ===
+        yield [str(verse.book or ""), str(verse.chapter), str(verse.verse), str(verse.text or "")]
+
+
+PARSER = WarayParser()
+
+if __name__ == "__main__":
+    main(PARSER)
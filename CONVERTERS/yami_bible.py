@@ -1,160 +1,204 @@
 import re
+import sys
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
-import pandas as pd
-
-def clean_text_to_excel(input_file, output_excel, sentences_output):
-    with open(input_file, "r", encoding="utf-8") as f:
-        lines = [ln.rstrip("\n") for ln in f]
-
-    verses_data = []
-    all_sentences = []
-
-    i = 0
-    total_lines = len(lines)
-    while i < total_lines:
-        # Detect the start of a book
-        book_match = re.match(r'^\s*(Matay|Make|Locya)\s*\d+', lines[i])
-        if book_match:
-            current_book = book_match.group(1)
-            chapter = 1
-            last_verse = 0
-            buffer = ""
-            book_lines = []
-
-            # Read lines until next book or end of file
-            while i < total_lines:
-                ln = lines[i].strip()
-                next_book_match = re.match(r'^\s*(Matay|Make|Locya)\s*\d+', ln)
-                if next_book_match and next_book_match.group(1) != current_book:
-                    break  # stop at the next book
-
-                # Skip lone book name lines
-                if re.match(r'^\s*(Matay|Make|Locya)\s*$', ln):
-                    i += 1
-                    continue
-
-                book_lines.append(ln)
-                i += 1
-
-            # --- Clean the book chunk ---
-
-            # 1) Remove parenthetical references
-            cleaned = []
-            j = 0
-            while j < len(book_lines):
-                ln = book_lines[j]
-                if re.search(r'\([^)]*:\d', ln):
-                    if cleaned and not re.match(r'^\s*\d', cleaned[-1]):
-                        cleaned.pop()
-                    j += 1
-                    continue
-                cleaned.append(ln)
-                j += 1
-            book_lines = cleaned
-
-            # 2) Remove Seysyo / copyright
-            cleaned = []
-            j = 0
-            while j < len(book_lines):
-                ln = book_lines[j]
-                if 'Seysyo No Tao' in ln or '© Bible Society' in ln:
-                    j += 1
-                    continue
-                if re.match(r'^\s*\d+\s*$', ln):
-                    lookahead = " ".join(book_lines[j+1:j+4])
-                    if 'Seysyo No Tao' in lookahead or '© Bible Society' in lookahead:
-                        j += 1
-                        continue
-                cleaned.append(ln)
-                j += 1
-            book_lines = cleaned
-
-            # 3) Join broken lines, split ranges, store chapter, verse, book, text
-            def flush():
-                nonlocal buffer, last_verse, chapter
-                s = re.sub(r'\s+', ' ', buffer.strip())
-                if not s:
-                    return
-                m = re.match(r'^(\d+)(?:-(\d+))?([^\s].*)?', s)
-                if m:
-                    verse_start = int(m.group(1))
-                    verse_end = int(m.group(2)) if m.group(2) else verse_start
-                    # numbering restart → new chapter
-                    if verse_start == 1 and last_verse > 1:
-                        chapter += 1
-                    last_verse = verse_start
-                    text = m.group(3).strip() if m.group(3) else ""
-
-                    # Remove punctuation (keep letters, digits, spaces)
-                    text_clean = re.sub(r'[^A-Za-z0-9\s]', '', text)
-
-                    for v in range(verse_start, verse_end + 1):
-                        verses_data.append({
-                            "Book": current_book,
-                            "Chapter": chapter,
-                            "Verse": v,
-                            "Text": text_clean
-                        })
-
-                        # Sentence segmentation (split on .,!,?)
-                        for s_part in re.split(r'(?<=[.!?])\s+', text):
-                            s_part = s_part.strip()
-                            if s_part:
-                                # Clean punctuation in segmented sentences too
-                                s_part_clean = re.sub(r'[^A-Za-z0-9\s]', '', s_part)
-                                all_sentences.append(s_part_clean)
-
-                else:
-                    text_clean = re.sub(r'[^A-Za-z0-9\s]', '', s)
-                    verses_data.append({
-                        "Book": current_book,
-                        "Chapter": chapter,
-                        "Verse": "",
-                        "Text": text_clean
-                    })
-                    all_sentences.append(text_clean)
-                buffer = ""
-
-            last_verse = 0
-            for idx, ln in enumerate(book_lines):
-                s = ln.strip()
-                next_ln = book_lines[idx+1] if idx+1 < len(book_lines) else ""
-                starts_with_verse = bool(re.match(r'^\d+(?:-\d+)?', s))
-                if starts_with_verse and buffer:
-                    flush()
-                buffer = (buffer + " " + s).strip() if buffer else s
-                next_starts_with_number = bool(re.match(r'^\d', next_ln.strip()))
-                if next_starts_with_number:
-                    flush()
-            if buffer:
-                flush()
-
-        else:
-            i += 1  # skip until first book
-
-    # --- Filter out leftover lines that are just book names ---
-    verses_data = [
-        row for row in verses_data
-        if not re.match(rf'^{row["Book"]}\s*\d*$', row["Text"])
-    ]
-
-    # Write Excel
-    df = pd.DataFrame(verses_data)
-    df = df[["Book", "Chapter", "Verse", "Text"]]
-    df.to_excel(output_excel, index=False)
-    print(f"Saved cleaned Excel to: {output_excel}")
 
-    # Write segmented sentences
-    with open(sentences_output, "w", encoding="utf-8") as sf:
-        for s in all_sentences:
-            sf.write(s.strip() + "\n")
-    print(f"Saved segmented sentences to: {sentences_output}")
-
-
-# === Usage ===
 base_dir = Path(__file__).resolve().parent.parent
-input_file = base_dir / "RAW_FILES" / "yami_bible.txt"
-excel_output = base_dir / "CONVERTED_FILES" / "yami_bible_cleaned.xlsx"
-sentences_output = base_dir / "CONVERTED_FILES" / "yami_sentences.txt"
-
-clean_text_to_excel(input_file, excel_output, sentences_output)
+sys.path.insert(0, str(base_dir))
+
+from PIPELINE.books import header_pattern
+from PIPELINE.engine import BibleParser, Verse, main
+from PIPELINE.line_classifier import LineClassifier
+from PIPELINE.normalizer import Normalizer
+from PIPELINE.segmenter import Segmenter
+
+book_names = header_pattern("yami")
+
+# Checked in this order on the stripped line; anything else is verse text
+line_classifier = LineClassifier([
+    ("book", rf'(?P<book>{book_names})\s*\d+'),
+    # Lone book name lines
+    ("lone_book", rf'{book_names}\s*$'),
+    # Parenthetical references
+    ("ref", r'.*?\([^)]*:\d'),
+    # Seysyo / copyright footer
+    ("footer", r'.*?(?:Seysyo No Tao|© Bible Society)'),
+    # A bare number (page or footer number)
+    ("number", r'\d+\s*$'),
+    ("verse", r'\d'),
+])
+verse_kinds = ("number", "verse")
+remove_punct = Normalizer(r'[^A-Za-z0-9\s]', strip=False)
+sentence_split_re = re.compile(r'(?<=[.!?])\s+')
+whole_verse = Segmenter(keep_empty=True)
+space_re = re.compile(r'\s+')
+verse_re = re.compile(r'^(\d+)(?:-(\d+))?([^\s].*)?')
+
+
+@lru_cache(maxsize=None)
+def book_name_filter(book):
+    """Compiled `^<book>\\s*\\d*$`, built once per book."""
+    return re.compile(rf'^{re.escape(book)}\s*\d*$')
+
+
+# Lines flow through the stages below as (book, kind, stripped line)
+def book_lines(items):
+    """Stage 1: tag each line with its book, from the first book header on."""
+    current_book = None
+    for kind, ln, book in items:
+        if kind == "book" and book != current_book:
+            current_book = book
+        if current_book is None or kind == "lone_book":
+            continue  # before the first book, or a lone book name line
+        yield current_book, kind, ln
+
+
+def drop_references(lines):
+    """Stage 2: drop parenthetical reference lines and the heading line before each.
+
+    Only lines since the last verse line can be dropped that way, so those
+    are the only ones held back.
+    """
+    held = []
+    current_book = None
+    for line in lines:
+        book, kind, _ = line
+        if book != current_book:
+            yield from held
+            held = []
+            current_book = book
+        if kind == "ref":
+            if held:
+                held.pop()
+        elif kind in verse_kinds:
+            yield from held
+            held = []
+            yield line
+        else:
+            held.append(line)
+    yield from held
+
+
+def drop_footers(lines, lookahead=3):
+    """Stage 3: drop Seysyo/copyright lines and the page numbers just before them."""
+    window = deque()
+
+    def release():
+        book, kind, _ = line = window.popleft()
+        if kind == "footer":
+            return None
+        if kind == "number" and any(b == book and k == "footer" for b, k, _ in window):
+            return None
+        return line
+
+    for line in lines:
+        window.append(line)
+        if len(window) > lookahead:
+            line = release()
+            if line is not None:
+                yield line
+    while window:
+        line = release()
+        if line is not None:
+            yield line
+
+
+def join_verses(lines):
+    """Stage 4: join broken lines into verses; a restart at verse 1 is a new chapter."""
+    lines = iter(lines)
+    line = next(lines, None)
+    while line is not None:
+        current_book = line[0]
+        chapter = 1
+        last_verse = 0
+        buffer = ""
+
+        def flush():
+            nonlocal chapter, last_verse
+            verse = parse_verse(current_book, chapter, last_verse, buffer)
+            if verse is not None:
+                chapter = verse.chapter
+                if verse.verse != "":
+                    last_verse = verse.verse
+                yield verse
+
+        # Each line is looked at together with the kind of the next one
+        while line is not None and line[0] == current_book:
+            _, kind, s = line
+            line = next(lines, None)
+            next_kind = line[1] if line is not None and line[0] == current_book else None
+            if kind in verse_kinds and buffer:
+                yield from flush()
+                buffer = ""
+            buffer = (buffer + " " + s).strip() if buffer else s
+            if next_kind in verse_kinds:
+                yield from flush()
+                buffer = ""
+        if buffer:
+            yield from flush()
+
+
+def parse_verse(book, chapter, last_verse, buffer):
+    """One Verse from a joined buffer (`12 text`, `3-5 text` or unnumbered), or None."""
+    s = space_re.sub(' ', buffer.strip())
+    if not s:
+        return None
+    m = verse_re.match(s)
+    if not m:
+        return Verse(book, chapter, "", s)
+
+    verse_start = int(m.group(1))
+    verse_end = int(m.group(2)) if m.group(2) else verse_start
+    # numbering restart → new chapter
+    if verse_start == 1 and last_verse > 1:
+        chapter += 1
+    text = m.group(3).strip() if m.group(3) else ""
+    if verse_end > verse_start:
+        verses = tuple(range(verse_start, verse_end + 1))
+        return Verse(book, chapter, verse_start, text, verses=verses)
+    return Verse(book, chapter, verse_start, text)
+
+
+class YamiParser(BibleParser):
+    """`Matay 1` book headers; chapters are only visible as verse numbering restarting at 1."""
+
+    language = "yami"
+    raw_file = "yami_bible.txt"
+    excel_file = "yami_bible_cleaned.xlsx"
+    sentences_file = "yami_sentences.txt"
+
+    def classify(self, line):
+        ln = line.strip()
+        kind, fields = line_classifier.classify(ln)
+        return kind, ln, fields.get("book")
+
+    def assemble(self, items):
+        # One pass over the file; only a few lines are held at any stage
+        return join_verses(drop_footers(drop_references(book_lines(items))))
+
+    def clean(self, verse):
+        return self.clean_batch([verse])[0]
+
+    def clean_batch(self, verses):
+        # Remove punctuation (keep letters, digits, spaces); the sentences
+        # (split on .,!,?) come out of the same pass
+        results = remove_punct.split_batch([verse.text for verse in verses], sentence_split_re)
+        cleaned = []
+        for verse, (text, pieces) in zip(verses, results):
+            if verse.verse == "":
+                spans = whole_verse.spans(text)
+            else:
+                spans = [(start, end) for s_part, start, end in pieces if s_part.strip()]
+            cleaned.append(verse._replace(text=text, spans=spans))
+        return cleaned
+
+    def keep(self, verse):
+        # Filter out leftover lines that are just book names
+        return not book_name_filter(verse.book).match(verse.text)
+
+
+PARSER = YamiParser()
+
+if __name__ == "__main__":
+    main(PARSER)
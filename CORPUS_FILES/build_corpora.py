@@ -0,0 +1,92 @@
+import argparse
+import sys
+import time
+from itertools import combinations
+from pathlib import Path
+
+# === CONFIG ===
+base_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(base_dir))
+
+from PIPELINE.alignment import (LANGUAGES, VerseAligner, build_excel_pair, corpus_dir, excel_path,
+                                pair_output_path, write_table)
+from PIPELINE.instrumentation import add_instrument_arguments, make_instruments
+
+
+def parse_pair(text):
+    codes = tuple(code.upper() for code in text.split("-"))
+    if len(codes) != 2 or not set(codes) <= set(LANGUAGES):
+        raise argparse.ArgumentTypeError(f"expected CODE-CODE from {sorted(LANGUAGES)}, got {text!r}")
+    return codes
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build parallel corpora from the verse stores, loading each language once.")
+    parser.add_argument("pairs", nargs="*", type=parse_pair,
+                        help="pairs to build, e.g. CEB-BIK ENG-SPA")
+    parser.add_argument("--all-pairs", action="store_true",
+                        help="build every pair of the selected languages")
+    parser.add_argument("--multilingual", action="store_true",
+                        help="also write MULTILINGUAL-CORPUS with one column per language")
+    parser.add_argument("--languages", nargs="+", type=str.upper, choices=sorted(LANGUAGES),
+                        help="languages used by --all-pairs/--multilingual (default: all)")
+    parser.add_argument("--parquet", action="store_true",
+                        help="write .parquet instead of .xlsx")
+    parser.add_argument("--from-excel", action="store_true",
+                        help="join the pairs from the converters' Excel exports, streamed")
+    add_instrument_arguments(parser)
+    args = parser.parse_args()
+    instruments = make_instruments(args, "corpora")
+
+    if not (args.pairs or args.all_pairs or args.multilingual):
+        parser.error("nothing to build: give pairs, --all-pairs or --multilingual")
+    if args.from_excel and (args.multilingual or args.parquet):
+        parser.error("--from-excel only builds .xlsx pairs")
+
+    selected = list(args.languages or LANGUAGES)
+    codes = list(selected) if (args.all_pairs or args.multilingual) else []
+    for pair in args.pairs:
+        codes += [code for code in pair if code not in codes]
+    suffix = ".parquet" if args.parquet else ".xlsx"
+
+    requested = list(args.pairs)
+    if args.all_pairs:
+        requested += [pair for pair in combinations(selected, 2) if pair not in requested]
+
+    # === STREAM PAIRS FROM THE EXCEL EXPORTS ===
+    start = time.perf_counter()
+    if args.from_excel:
+        for code in dict.fromkeys(code for pair in requested for code in pair):
+            if not excel_path(code).exists():
+                parser.error(f"{excel_path(code).name} not found; run its converter with --excel")
+        for code1, code2 in requested:
+            output_file = pair_output_path(code1, code2)
+            rows = build_excel_pair(code1, code2, output_file, instruments=instruments)
+            print(f"{output_file.name}: {rows} aligned verses")
+    else:
+        # === LOAD EVERY LANGUAGE ONCE ===
+        aligner = VerseAligner(codes, instruments=instruments)
+        print(f"Loaded {len(codes)} languages in {time.perf_counter() - start:.2f}s")
+
+        # === BUILD PAIRS ===
+        for (code1, code2), table in aligner.pairs(requested):
+            output_file = pair_output_path(code1, code2, suffix)
+            write_table(table, output_file, instruments)
+            print(f"{output_file.name}: {len(table)} aligned verses")
+
+        # === BUILD MULTILINGUAL TABLE ===
+        if args.multilingual:
+            table = aligner.multilingual(selected)
+            output_file = corpus_dir / f"MULTILINGUAL-CORPUS{suffix}"
+            write_table(table, output_file, instruments)
+            print(f"{output_file.name}: {len(table)} references x {len(selected)} languages")
+
+    instruments.finish()
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+    if args.stats:
+        print(f"Saved -> {instruments.write(args.stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Shared conversion pipeline used by the scripts in CONVERTERS and CORPUS_FILES."""
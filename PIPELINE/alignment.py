@@ -0,0 +1,337 @@
+"""N-way verse alignment over the per-language verse stores.
+
+VerseAligner loads the packed verse key and text of every requested
+language once (book names were already resolved to book ids by the
+converters, see verse_key.py).  A pair corpus is an interval join over
+the keys: every row of a verse store covers the keys from `key` to
+`end_key` (a verse range such as Ilocano "6b-11" covers several verses,
+and a verse without a letter covers its lettered parts), and rows of the
+two languages that overlap, directly or through a chain of overlaps, are
+merged into one aligned row.  For plain verse-by-verse stores this is the
+same as an inner join on the key.  The multilingual table is the sorted
+union of keys with one text column per language, so building every pair
+costs little more than loading the inputs.
+
+The corpus scripts used to pd.read_excel() both *_bible_cleaned.xlsx
+exports and merge them on Book/Chapter/Verse.  build_excel_pair() still
+builds a pair from those files, in bounded memory: each export is read
+row by row (see excel_io.py), put in key order by an external sort, and
+the two sorted streams are merge-joined straight into the output sheet.
+"""
+import heapq
+import pickle
+import tempfile
+from collections import namedtuple
+from functools import lru_cache
+from itertools import combinations, groupby
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+
+from PIPELINE.excel_io import ExcelSink, read_rows, write_frame
+from PIPELINE.instrumentation import NULL_INSTRUMENTS
+from PIPELINE.books import BOOK_NAMES
+from PIPELINE.verse_key import FIELD_MASK, NO_KEY, PART_MASK, VERSE_SHIFT, decode, decode_columns
+from PIPELINE.verse_store import converted_dir, expand_table, read_table, record_key
+
+base_dir = Path(__file__).resolve().parent.parent
+corpus_dir = base_dir / "CORPUS_FILES"
+chunk_size = 100_000
+
+Language = namedtuple("Language", ["code", "store", "label"])
+
+# code -> verse store name and the column label used in the corpus files
+LANGUAGES = {lang.code: lang for lang in [
+    Language("BIK", "bikolano", "Bikolano"),
+    Language("CEB", "cebuano", "Cebuano"),
+    Language("CHA", "chavacano", "Chavacano"),
+    Language("ENG", "english", "English"),
+    Language("HIL", "hiligaynon", "Hiligaynon"),
+    Language("ILO", "ilocano", "Ilocano"),
+    Language("MAR", "maranao", "Maranao"),
+    Language("PAN", "pangasinan", "Pangasinan"),
+    Language("SPA", "spanish", "Spanish"),
+    Language("TAG", "tagalog", "Tagalog"),
+    Language("WAR", "waray_waray", "Waray"),
+    Language("YAM", "yami", "Yami"),
+]}
+
+
+class VerseAligner:
+    """Load languages once and build any pair or the multilingual table from the loaded keys."""
+
+    def __init__(self, codes=None, directory=None, instruments=NULL_INSTRUMENTS):
+        self.codes = list(codes or LANGUAGES)
+        self.instruments = instruments
+
+        # Per language: the store's rows as key/end_key/Text (a range is one
+        # row), and packed verse key -> text with every verse of a range
+        # under its own key, both in the language's own row order.  Book
+        # names were resolved to book ids when the store was written.
+        self.ranges = {}
+        self.texts = {}
+        for code in self.codes:
+            with instruments.stage("load"):
+                table = read_table(LANGUAGES[code].store, directory, columns=["key", "end_key", "text"])
+                ranges = table.filter(pc.is_valid(table["key"]))
+                df = expand_table(ranges).drop(["end_key"]).to_pandas()
+            instruments.count("rows_loaded", table.num_rows)
+            instruments.count("rows_without_key", table.num_rows - ranges.num_rows)
+            self.ranges[code] = ranges.to_pandas().rename(columns={"text": "Text"})
+            self.texts[code] = df.rename(columns={"text": "Text"})
+
+    def _with_keys(self, table):
+        keys = table.pop("key").to_numpy()
+        columns = pd.DataFrame(decode_columns(keys))
+        if "end_key" in table:
+            # Last verse of a merged row, only kept if some row spans several verses
+            end_verse = (table.pop("end_key").to_numpy() >> VERSE_SHIFT) & FIELD_MASK
+            if (end_verse != columns["Verse"]).any():
+                columns.insert(3, "EndVerse", end_verse)
+        table = pd.concat([columns, table.reset_index(drop=True)], axis=1)
+        if (table["Part"] == "").all():
+            table = table.drop(columns="Part")
+        return table
+
+    def pair(self, code1, code2):
+        """Verses present in both languages: Book, Chapter, Verse, <label1>, <label2>.
+
+        Overlapping verse ranges are merged into one row (see interval_join());
+        an EndVerse column gives the last verse of such rows.
+        """
+        label1, label2 = LANGUAGES[code1].label, LANGUAGES[code2].label
+        with self.instruments.stage("join"):
+            merged = interval_join(self.ranges[code1], self.ranges[code2], label1, label2)
+            table = self._with_keys(merged)
+        self.instruments.count("aligned_rows", len(table))
+        return table
+
+    def pairs(self, pairs=None):
+        """Yield ((code1, code2), table) for the requested pairs, default every pair."""
+        for code1, code2 in pairs or combinations(self.codes, 2):
+            yield (code1, code2), self.pair(code1, code2)
+
+    def multilingual(self, codes=None):
+        """Every reference with one text column per language (empty where missing).
+
+        A language with several rows for the same reference has them joined with a space.
+        """
+        codes = list(codes or self.codes)
+        with self.instruments.stage("multilingual"):
+            return self._multilingual(codes)
+
+    def _multilingual(self, codes):
+        used = np.unique(np.concatenate([self.texts[code]["key"].to_numpy() for code in codes]))
+        table = pd.DataFrame({"key": used})
+        for code in codes:
+            texts = self.texts[code].groupby("key", sort=False)["Text"].agg(" ".join)
+            table[LANGUAGES[code].label] = table["key"].map(texts).fillna("")
+        return self._with_keys(table)
+
+
+def interval_join(left, right, label1, label2):
+    """Align two key/end_key/Text frames by overlapping key intervals.
+
+    Both sides are put in one list sorted by start key; a sweep keeping
+    the furthest end seen so far cuts the list into groups of intervals
+    that overlap one another.  Every group with rows from both sides is
+    one output row with key/end_key spanning the group and the texts of
+    each side joined with a space, in key order.  Apart from the sort the
+    work is linear in the number of rows.
+    """
+    n = len(left)
+    starts = np.concatenate([left["key"].to_numpy(), right["key"].to_numpy()]).astype(np.int64)
+    ends = np.concatenate([left["end_key"].to_numpy(), right["end_key"].to_numpy()]).astype(np.int64)
+    texts = np.concatenate([left["Text"].to_numpy(dtype=object), right["Text"].to_numpy(dtype=object)])
+    side = np.arange(len(starts)) >= n
+
+    # A verse without a letter also covers its lettered parts (6 covers 6a, 6b)
+    covers = np.where(ends & PART_MASK, ends, ends | PART_MASK)
+    order = np.lexsort((side, starts))
+    starts, ends, covers, texts, side = starts[order], ends[order], covers[order], texts[order], side[order]
+
+    reach = np.maximum.accumulate(covers) if len(covers) else covers
+    new_group = np.ones(len(starts), dtype=bool)
+    new_group[1:] = starts[1:] > reach[:-1]
+    group = np.cumsum(new_group) - 1
+    first = np.flatnonzero(new_group)
+    n_groups = len(first)
+
+    has_left = np.bincount(group, weights=~side, minlength=n_groups) > 0
+    has_right = np.bincount(group, weights=side, minlength=n_groups) > 0
+    aligned = has_left & has_right
+    sizes = np.bincount(group, minlength=n_groups)
+
+    # The usual case, one verse on each side, needs no string joining
+    text1 = np.empty(n_groups, dtype=object)
+    text2 = np.empty(n_groups, dtype=object)
+    simple = aligned & (sizes == 2)
+    lead = first[simple]
+    left_first = ~side[lead]
+    text1[simple] = np.where(left_first, texts[lead], texts[lead + 1])
+    text2[simple] = np.where(left_first, texts[lead + 1], texts[lead])
+    merged = aligned & ~simple
+    if merged.any():
+        rows = merged[group]
+        joined = pd.DataFrame({"group": group[rows], "side": side[rows], "text": texts[rows]})
+        joined = joined.groupby(["group", "side"], sort=False)["text"].agg(" ".join)
+        for (g, s), text in joined.items():
+            (text2 if s else text1)[g] = text
+
+    end_keys = np.maximum.reduceat(ends, first) if n_groups else ends
+    return pd.DataFrame({
+        "key": starts[first][aligned],
+        "end_key": end_keys[aligned],
+        label1: text1[aligned],
+        label2: text2[aligned],
+    })
+
+
+def pair_output_path(code1, code2, suffix=".xlsx"):
+    return corpus_dir / f"{code1}-{code2}-CORPUS{suffix}"
+
+
+def write_table(table, path, instruments=NULL_INSTRUMENTS):
+    """Write a corpus table as .xlsx (streamed, see excel_io.py) or .parquet depending on the suffix."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with instruments.stage("write"):
+        if path.suffix == ".parquet":
+            table.to_parquet(path, index=False)
+        else:
+            write_frame(table, path)
+    instruments.count("rows_written", len(table))
+
+
+def excel_path(code, directory=None):
+    """A language's Excel export, under the name its converter writes (PARSER.excel_file)."""
+    return Path(directory or converted_dir) / excel_files()[LANGUAGES[code].store]
+
+
+@lru_cache(maxsize=None)
+def excel_files():
+    """{language: excel_file} for every converter in CONVERTERS."""
+    from PIPELINE.convert_all import discover_converters, load_converter
+
+    return {language: load_converter(script).PARSER.excel_file
+            for language, script in discover_converters().items()}
+
+
+def excel_verses(path):
+    """Yield (key, text) for every row of a converter's Excel export, in file order.
+
+    Accepts the Book/Chapter/Verse/Text layout and its variants (column
+    names are matched case-insensitively): the text column may be called
+    Sentence, and the reference may be one "chapter:verse" column, either
+    as Verse without a Chapter column (Ilocano) or as "chapter:verse"
+    (Pangasinan).  Rows whose reference does not resolve to a key are
+    skipped.
+    """
+    for row in read_rows(path):
+        row = {str(column).lower(): value for column, value in row.items()}
+        text = row.get("text", row.get("sentence"))
+        if "chapter" in row:
+            chapter, verse = row["chapter"], row["verse"]
+        else:
+            ref = row.get("chapter:verse", row.get("verse"))
+            chapter, _, verse = ("" if ref is None else str(ref)).partition(":")
+        key = record_key(row["book"], chapter, verse)
+        if key != NO_KEY:
+            yield key, "" if text is None else str(text)
+
+
+def sorted_by_key(rows, chunk_size=chunk_size):
+    """External sort of (key, text) rows by key, keeping file order for equal keys.
+
+    Rows are sorted `chunk_size` at a time and each sorted run is spilled
+    to a temporary file; the runs are then merged lazily, so memory holds
+    one chunk while sorting and one row per run while merging.  An input
+    that fits in one chunk is never spilled.
+    """
+    runs = []
+    while True:
+        chunk = [row for _, row in zip(range(chunk_size), rows)]
+        # list.sort() is stable, so only the key is compared
+        chunk.sort(key=lambda row: row[0])
+        if len(chunk) < chunk_size and not runs:
+            yield from chunk
+            return
+        if chunk:
+            run = tempfile.TemporaryFile()
+            for row in chunk:
+                pickle.dump(row, run)
+            run.seek(0)
+            runs.append(run)
+        if len(chunk) < chunk_size:
+            break
+    try:
+        yield from heapq.merge(*(_read_run(run) for run in runs), key=lambda row: row[0])
+    finally:
+        for run in runs:
+            run.close()
+
+
+def _read_run(run):
+    while True:
+        try:
+            yield pickle.load(run)
+        except EOFError:
+            return
+
+
+def merge_join(left, right):
+    """Inner sort-merge join of two key-sorted (key, text) streams.
+
+    Yields (key, text1, text2) for every key on both sides, as soon as the
+    key has been passed on both.  Several rows with the same key on one
+    side are joined with a space.
+    """
+    left = ((key, " ".join(text for _, text in rows)) for key, rows in groupby(left, lambda row: row[0]))
+    right = ((key, " ".join(text for _, text in rows)) for key, rows in groupby(right, lambda row: row[0]))
+    a, b = next(left, None), next(right, None)
+    while a is not None and b is not None:
+        if a[0] < b[0]:
+            a = next(left, None)
+        elif a[0] > b[0]:
+            b = next(right, None)
+        else:
+            yield a[0], a[1], b[1]
+            a, b = next(left, None), next(right, None)
+
+
+def build_excel_pair(code1, code2, output_file=None, directory=None, instruments=NULL_INSTRUMENTS):
+    """Build one pair corpus from the two Excel exports, streaming it to `output_file`.
+
+    The rows are Book, Chapter, Verse, <label1>, <label2>, one per verse in
+    both files (a sub-verse such as 6a keeps its letter in Verse).
+    Returns the number of rows written.
+    """
+    label1, label2 = LANGUAGES[code1].label, LANGUAGES[code2].label
+    output_file = Path(output_file or pair_output_path(code1, code2))
+    left = sorted_by_key(instruments.timed("load", excel_verses(excel_path(code1, directory)), "rows_loaded"))
+    right = sorted_by_key(instruments.timed("load", excel_verses(excel_path(code2, directory)), "rows_loaded"))
+
+    sink = ExcelSink(output_file, ["Book", "Chapter", "Verse", label1, label2])
+    with instruments.stage("join"):
+        for key, text1, text2 in merge_join(left, right):
+            book, chapter, verse, part = decode(key)
+            sink.write([BOOK_NAMES[book], chapter, f"{verse}{part}" if part else verse, text1, text2])
+    with instruments.stage("write"):
+        sink.close()
+    instruments.count("rows_written", sink.count)
+    return sink.count
+
+
+def build_pair_corpus(code1, code2, output_file=None, instruments=NULL_INSTRUMENTS):
+    """Build and save one pair corpus the way the CORPUS_FILES scripts did."""
+    table = VerseAligner([code1, code2], instruments=instruments).pair(code1, code2)
+    output_file = Path(output_file or pair_output_path(code1, code2))
+    write_table(table, output_file, instruments)
+    instruments.finish()
+
+    print(f"{LANGUAGES[code1].label}-{LANGUAGES[code2].label} parallel corpus successfully created!")
+    print(f"Output file: {output_file}")
+    print(f"Normalized books: {sorted(table['Book'].unique())}")
+    print(f"Total aligned verses: {len(table)}")
+    return table
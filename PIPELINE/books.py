@@ -0,0 +1,277 @@
+"""Canonical book table and the book names each translation uses.
+
+Books are numbered 1-66 in Protestant canon order, so Matthew, Mark and
+Luke are 40, 41 and 42 (the same numbers the Cebuano source uses as 40N,
+41N and 42N).
+
+Every name a book goes by is registered here once: the English name and
+its usual abbreviations, the Spanish and Tagalog names, and the names
+each of our raw files prints in its book headers (HEADER_NAMES).  The
+registry is compiled into one BookMatcher, a trie over every alias:
+
+    book_matcher.match("San Mateo 5")           # -> (40, 9): id and end of the name
+    header_pattern("maranao")                   # regex for the converter's header rule
+    header_names("chavacano")                   # -> ["Mateo", "Marcos", "Lucas"]
+
+A BookTracker follows the book through a file whose verses only carry
+chapter:verse numbers, for the three gospels we ship or a whole Bible.
+
+book_matcher ignores case and only accepts a name that is followed by a
+non-letter, so "Mark" is not found in "Market".
+"""
+import unicodedata
+
+BOOKS = [
+    "Genesis", "Exodus", "Leviticus", "Numbers", "Deuteronomy", "Joshua", "Judges",
+    "Ruth", "1 Samuel", "2 Samuel", "1 Kings", "2 Kings", "1 Chronicles", "2 Chronicles",
+    "Ezra", "Nehemiah", "Esther", "Job", "Psalms", "Proverbs", "Ecclesiastes",
+    "Song of Solomon", "Isaiah", "Jeremiah", "Lamentations", "Ezekiel", "Daniel", "Hosea",
+    "Joel", "Amos", "Obadiah", "Jonah", "Micah", "Nahum", "Habakkuk", "Zephaniah",
+    "Haggai", "Zechariah", "Malachi",
+    "Matthew", "Mark", "Luke", "John", "Acts", "Romans", "1 Corinthians", "2 Corinthians",
+    "Galatians", "Ephesians", "Philippians", "Colossians", "1 Thessalonians",
+    "2 Thessalonians", "1 Timothy", "2 Timothy", "Titus", "Philemon", "Hebrews", "James",
+    "1 Peter", "2 Peter", "1 John", "2 John", "3 John", "Jude", "Revelation",
+]
+
+# Book id -> standard name; index 0 is unused so BOOK_NAMES[40] == "Matthew"
+BOOK_NAMES = [""] + BOOKS
+
+# English abbreviations, in canon order
+ABBREVIATIONS = [
+    ["Gen", "Gn"], ["Exod", "Ex"], ["Lev", "Lv"], ["Num", "Nm"], ["Deut", "Dt"],
+    ["Josh"], ["Judg", "Jdg"], ["Rth"], ["1 Sam", "1 Sm"], ["2 Sam", "2 Sm"],
+    ["1 Kgs", "1 Kings"], ["2 Kgs", "2 Kings"], ["1 Chr", "1 Chron"], ["2 Chr", "2 Chron"],
+    ["Ezr"], ["Neh"], ["Esth"], ["Jb"], ["Ps", "Psa", "Psalm"], ["Prov", "Prv"],
+    ["Eccl", "Qoh"], ["Song", "Song of Songs", "Canticles"], ["Isa"], ["Jer"], ["Lam"],
+    ["Ezek", "Ezk"], ["Dan", "Dn"], ["Hos"], ["Jl"], ["Am"], ["Obad", "Ob"], ["Jon"],
+    ["Mic"], ["Nah"], ["Hab"], ["Zeph"], ["Hag"], ["Zech"], ["Mal"],
+    ["Mat", "Matt", "Mt"], ["Mar", "Mk", "Mrk"], ["Luk", "Lk"], ["Jn", "Jhn"], ["Act"],
+    ["Rom"], ["1 Cor"], ["2 Cor"], ["Gal"], ["Eph"], ["Phil", "Php"], ["Col"],
+    ["1 Thess", "1 Thes"], ["2 Thess", "2 Thes"], ["1 Tim"], ["2 Tim"], ["Tit"],
+    ["Phlm", "Phm"], ["Heb"], ["Jas"], ["1 Pet", "1 Pt"], ["2 Pet", "2 Pt"],
+    ["1 Jn"], ["2 Jn"], ["3 Jn"], ["Jud"], ["Rev", "Apocalypse"],
+]
+
+SPANISH = [
+    "Génesis", "Éxodo", "Levítico", "Números", "Deuteronomio", "Josué", "Jueces",
+    "Rut", "1 Samuel", "2 Samuel", "1 Reyes", "2 Reyes", "1 Crónicas", "2 Crónicas",
+    "Esdras", "Nehemías", "Ester", "Job", "Salmos", "Proverbios", "Eclesiastés",
+    "Cantares", "Isaías", "Jeremías", "Lamentaciones", "Ezequiel", "Daniel", "Oseas",
+    "Joel", "Amós", "Abdías", "Jonás", "Miqueas", "Nahúm", "Habacuc", "Sofonías",
+    "Hageo", "Zacarías", "Malaquías",
+    "Mateo", "Marcos", "Lucas", "Juan", "Hechos", "Romanos", "1 Corintios", "2 Corintios",
+    "Gálatas", "Efesios", "Filipenses", "Colosenses", "1 Tesalonicenses",
+    "2 Tesalonicenses", "1 Timoteo", "2 Timoteo", "Tito", "Filemón", "Hebreos", "Santiago",
+    "1 Pedro", "2 Pedro", "1 Juan", "2 Juan", "3 Juan", "Judas", "Apocalipsis",
+]
+
+TAGALOG = [
+    "Genesis", "Exodo", "Levitico", "Mga Bilang", "Deuteronomio", "Josue", "Mga Hukom",
+    "Ruth", "1 Samuel", "2 Samuel", "1 Mga Hari", "2 Mga Hari", "1 Cronica", "2 Cronica",
+    "Ezra", "Nehemias", "Ester", "Job", "Mga Awit", "Mga Kawikaan", "Eclesiastes",
+    "Awit ng mga Awit", "Isaias", "Jeremias", "Mga Panaghoy", "Ezekiel", "Daniel", "Oseas",
+    "Joel", "Amos", "Obadias", "Jonas", "Mikas", "Nahum", "Habakuk", "Zefanias",
+    "Hagai", "Zacarias", "Malakias",
+    "Mateo", "Marcos", "Lucas", "Juan", "Mga Gawa", "Roma", "1 Corinto", "2 Corinto",
+    "Galacia", "Efeso", "Filipos", "Colosas", "1 Tesalonica",
+    "2 Tesalonica", "1 Timoteo", "2 Timoteo", "Tito", "Filemon", "Hebreo", "Santiago",
+    "1 Pedro", "2 Pedro", "1 Juan", "2 Juan", "3 Juan", "Judas", "Pahayag",
+]
+
+# Number of chapters in each book, in canon order
+CHAPTERS = [0,
+    50, 40, 27, 36, 34, 24, 21, 4, 31, 24, 22, 25, 29, 36, 10, 13, 10, 42, 150, 31, 12, 8,
+    66, 52, 5, 48, 12, 14, 3, 9, 1, 4, 7, 3, 3, 3, 2, 14, 4,
+    28, 16, 24, 21, 28, 16, 16, 13, 6, 6, 4, 4, 5, 3, 6, 4, 3, 1, 13, 5, 5, 3, 5, 1, 1, 1, 22,
+]
+
+# The books in our raw files, in the order they appear
+SOURCE_BOOKS = [40, 41, 42]
+
+# Every book, for whole-Bible inputs
+CANON = list(range(1, 67))
+
+# Book id -> the names each raw file prints in its book headers; the first
+# name is the one the converter writes out
+HEADER_NAMES = {
+    "bikolano": {40: ["Mateo"], 41: ["Markos"], 42: ["Lukas"]},
+    "cebuano": {book: [f"{book}N"] for book in range(1, 67)},
+    "chavacano": {40: ["Mateo"], 41: ["Marcos"], 42: ["Lucas"]},
+    "english": {book: [name] for book, name in enumerate(BOOKS, start=1)},
+    "hiligaynon": {40: ["MATEO"], 41: ["MARCOS", "MAR", "MARK"], 42: ["LUCAS", "LUKAS"]},
+    "ilocano": {40: ["San Mateo"], 41: ["San Marcos"], 42: ["San Lucas"]},
+    "maranao": {40: ["MATIYO"], 41: ["MARKO"], 42: ["LOKAS"]},
+    "pangasinan": {40: ["Mateo"], 41: ["Marcos"], 42: ["Lucas"]},
+    "spanish": {book: [name] for book, name in enumerate(SPANISH, start=1)},
+    "tagalog": {book: [name] for book, name in enumerate(TAGALOG, start=1)},
+    "waray_waray": {40: ["Mateo"], 41: ["Marcos"], 42: ["Lucas"]},
+    "yami": {40: ["Matay"], 41: ["Make"], 42: ["Locya"]},
+}
+
+
+def _fold(name):
+    """Lower case with accents removed: "Génesis" -> "genesis"."""
+    decomposed = unicodedata.normalize("NFD", name.strip().lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _register(aliases, name, book):
+    for alias in {name.strip().lower(), _fold(name)}:
+        if aliases.setdefault(alias, book) != book:
+            raise ValueError(f"Book alias {alias!r} is used for books {aliases[alias]} and {book}")
+
+
+# Every registered name (lower case, with and without accents) -> book id
+book_aliases = {}
+for book, names in enumerate(zip(BOOKS, ABBREVIATIONS, SPANISH, TAGALOG), start=1):
+    english, abbreviations, spanish, tagalog = names
+    for name in [english, *abbreviations, spanish, tagalog]:
+        _register(book_aliases, name, book)
+for names in HEADER_NAMES.values():
+    for book, headers in names.items():
+        for name in headers:
+            _register(book_aliases, name, book)
+
+
+class BookMatcher:
+    """Trie over book aliases.
+
+    With ignore_case (the default) aliases are stored lower case and the
+    text is lower-cased one character at a time, so offsets refer to the
+    original text.
+    """
+
+    def __init__(self, aliases, ignore_case=True):
+        self.ignore_case = ignore_case
+        # Node i: children[i] maps a character to a node, books[i] is the
+        # book id of the alias ending there (or None)
+        self.children = [{}]
+        self.books = [None]
+        for alias, book in aliases.items():
+            if ignore_case:
+                alias = alias.lower()
+            node = 0
+            for ch in alias:
+                nxt = self.children[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.children)
+                    self.children[node][ch] = nxt
+                    self.children.append({})
+                    self.books.append(None)
+                node = nxt
+            self.books[node] = book
+
+    def _fold(self, ch):
+        return ch.lower() if self.ignore_case else ch
+
+    @staticmethod
+    def _ends_word(text, end):
+        return end == len(text) or not text[end].isalpha()
+
+    def match(self, text, pos=0):
+        """(book id, end) for the longest alias starting at `pos`, or None."""
+        node, best = 0, None
+        for i in range(pos, len(text)):
+            node = self.children[node].get(self._fold(text[i]))
+            if node is None:
+                break
+            if self.books[node] is not None and self._ends_word(text, i + 1):
+                best = (self.books[node], i + 1)
+        return best
+
+    def pattern(self, node=0):
+        """Regex source matching exactly the aliases below `node`, shaped like the trie."""
+        branches = []
+        for ch, child in sorted(self.children[node].items()):
+            branch = _escape(ch)
+            rest = self.pattern(child) if self.children[child] else ""
+            if rest and self.books[child] is not None:
+                rest = f"(?:{rest})?"
+            branches.append(branch + rest)
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+
+def _escape(ch):
+    return "\\" + ch if not ch.isalnum() and ch != " " else ch
+
+
+book_matcher = BookMatcher(book_aliases)
+
+
+def header_pattern(language):
+    """Regex source matching the book names `language` prints in its headers.
+
+    The alternation is built from a trie of the names, so the regex engine
+    never tries one name after another.  It is case-sensitive unless the
+    rule it goes into is compiled with re.IGNORECASE.
+    """
+    names = {name: book for book, headers in HEADER_NAMES[language].items()
+             for name in headers}
+    return BookMatcher(names, ignore_case=False).pattern()
+
+
+def header_names(language, books=SOURCE_BOOKS):
+    """The name `language` writes out for each of `books` (English if it has none)."""
+    names = HEADER_NAMES[language]
+    return [names[book][0] if book in names else BOOK_NAMES[book] for book in books]
+
+
+def book_header(line):
+    """Book id if the whole line is a book name ("Génesis", "1 Mga Hari"), else None."""
+    line = line.strip()
+    found = book_matcher.match(line)
+    return found[0] if found and found[1] == len(line) else None
+
+
+class BookTracker:
+    """Tell which book each verse of a chapter:verse stream belongs to.
+
+    `books` are the book ids in the order the input has them: SOURCE_BOOKS
+    for our three-gospel files, CANON for a whole Bible.  A header line
+    naming a book (see book_header) switches to it explicitly.  Without one a
+    new book starts when the chapter goes back to 1, or, for a one-chapter
+    book such as Jude, when its verse numbers start again.
+    """
+
+    def __init__(self, books=SOURCE_BOOKS):
+        self.books = list(books)
+        self.index = 0
+        self.last = None  # (chapter, verse) of the previous verse
+
+    @property
+    def book(self):
+        return self.books[self.index]
+
+    def header(self, book):
+        """A header named `book`: the verses that follow belong to it."""
+        if book in self.books:
+            self.index = self.books.index(book)
+            self.last = None
+
+    def step(self, chapter, verse):
+        """Book id of the verse numbered chapter:verse (ints)."""
+        if self.last is not None:
+            last_chapter, last_verse = self.last
+            restarted = chapter == 1 and (
+                last_chapter > 1 or (CHAPTERS[self.book] == 1 and verse <= last_verse))
+            if restarted and self.index + 1 < len(self.books):
+                self.index += 1
+        self.last = (chapter, verse)
+        return self.book
+
+
+def book_id(name):
+    """Return the 1-66 id for a book name in any of our translations, or None."""
+    if name is None:
+        return None
+    name = str(name).strip().lower()
+    book = book_aliases.get(name)
+    return book if book is not None else book_aliases.get(_fold(name))
+
+
+def book_name(book_id):
+    """Standard English name for a book id."""
+    return BOOK_NAMES[book_id]
@@ -0,0 +1,210 @@
+"""Incremental build of RAW_FILES -> CONVERTED_FILES -> CORPUS_FILES.
+
+    python PIPELINE/build.py                      # rebuild whatever is out of date
+    python PIPELINE/build.py corpus:CEB-BIK       # one target and what it needs
+    python PIPELINE/build.py --dry-run            # only list the stale steps
+    python PIPELINE/build.py --force --jobs 4
+
+The build graph has one node per converter (raw file -> verse store, lookup
+file and sentence file) and one per corpus script (two verse stores -> the
+pair corpus).  A node is up to date when its outputs exist and the SHA-256
+of its inputs, its script and the PIPELINE modules it runs on is the one
+recorded after its last successful run (in .build_state.json).  Stale nodes
+are run in parallel as soon as everything they consume is built, and a node
+whose inputs come out byte-for-byte unchanged is not rerun, so editing
+waray_waray_bible.txt reruns the Waray converter and nothing else.
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(base_dir))
+
+from PIPELINE.alignment import LANGUAGES, pair_output_path
+from PIPELINE.convert_all import discover_converters, load_converter
+from PIPELINE.verse_store import converted_dir, store_path
+from PIPELINE.verse_text_store import text_store_path
+
+pipeline_dir = base_dir / "PIPELINE"
+corpus_dir = base_dir / "CORPUS_FILES"
+state_file = base_dir / ".build_state.json"
+
+# PIPELINE modules each kind of step runs on; editing one makes those steps stale
+converter_code = ["engine.py", "verse_store.py", "verse_key.py", "books.py", "verse_text_store.py",
+                  "instrumentation.py", "line_classifier.py", "normalizer.py",
+                  "segmenter.py", "excel_io.py", "convert_all.py"]
+corpus_code = ["alignment.py", "verse_store.py", "verse_key.py", "books.py", "instrumentation.py",
+               "excel_io.py"]
+
+Node = namedtuple("Node", ["name", "command", "inputs", "code", "outputs"])
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def fingerprint(node):
+    """One hash over the node's command, code and input contents."""
+    h = hashlib.sha256(" ".join(node.command[1:]).encode("utf-8"))
+    for path in node.code + node.inputs:
+        h.update(str(path.relative_to(base_dir)).encode("utf-8"))
+        h.update(file_hash(path).encode("ascii") if path.exists() else b"missing")
+    return h.hexdigest()
+
+
+def build_graph(excel=False):
+    """Return {name: Node} for every converter and corpus script."""
+    nodes = {}
+    for language, script in discover_converters().items():
+        parser = load_converter(script).PARSER
+        outputs = [store_path(language), text_store_path(language)]
+        if parser.sentences_file:
+            outputs.append(converted_dir / parser.sentences_file)
+        command = [sys.executable, str(script)]
+        if excel:
+            outputs.append(converted_dir / parser.excel_file)
+            command.append("--excel")
+        nodes[f"convert:{language}"] = Node(
+            f"convert:{language}", command, [base_dir / "RAW_FILES" / parser.raw_file],
+            [script] + [pipeline_dir / name for name in converter_code], outputs)
+
+    for script in sorted(corpus_dir.glob("*_corpus.py")):
+        code1, code2 = script.stem.upper().split("_")[:2]
+        nodes[f"corpus:{code1}-{code2}"] = Node(
+            f"corpus:{code1}-{code2}", [sys.executable, str(script)],
+            [store_path(LANGUAGES[code].store) for code in (code1, code2)],
+            [script] + [pipeline_dir / name for name in corpus_code],
+            [pair_output_path(code1, code2)])
+    return nodes
+
+
+def dependencies(nodes):
+    """{name: set of node names whose outputs it reads}."""
+    producers = {path: node.name for node in nodes.values() for path in node.outputs}
+    return {name: {producers[path] for path in node.inputs if path in producers}
+            for name, node in nodes.items()}
+
+
+def with_dependencies(targets, deps):
+    selected, todo = set(), list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in selected:
+            selected.add(name)
+            todo.extend(deps[name])
+    return selected
+
+
+def load_state():
+    if state_file.exists():
+        return json.loads(state_file.read_text(encoding="utf-8"))
+    return {}
+
+
+def save_state(state):
+    state_file.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def is_stale(node, state):
+    return (any(not path.exists() for path in node.outputs)
+            or state.get(node.name) != fingerprint(node))
+
+
+def run_node(node):
+    """Worker: run one step in its own interpreter and return (seconds, returncode, output)."""
+    start = time.perf_counter()
+    result = subprocess.run(node.command, cwd=base_dir, capture_output=True, text=True)
+    return time.perf_counter() - start, result.returncode, result.stdout + result.stderr
+
+
+def build(targets=None, jobs=None, excel=False, force=False, dry_run=False):
+    """Rebuild the stale nodes among `targets` (default: all) and their dependencies.
+
+    Returns the names of the nodes that failed.
+    """
+    nodes = build_graph(excel)
+    deps = dependencies(nodes)
+    unknown = sorted(set(targets or []) - set(nodes))
+    if unknown:
+        raise ValueError(f"Unknown targets: {unknown} (choose from {sorted(nodes)})")
+    selected = with_dependencies(targets or nodes, deps)
+    state = load_state()
+
+    if dry_run:
+        # Staleness of downstream nodes can only be known after upstream ones run
+        for name in sorted(selected):
+            if force or is_stale(nodes[name], state):
+                print(f"stale  {name}")
+        return []
+
+    jobs = jobs or os.cpu_count() or 1
+    waiting = {name: deps[name] & selected for name in selected}
+    done, failed, running = set(), [], {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while waiting or running:
+            for name in sorted(waiting):
+                if not waiting[name] <= done:
+                    continue
+                del waiting[name]
+                node = nodes[name]
+                if not (force or is_stale(node, state)):
+                    print(f"{name:<22} up to date")
+                    done.add(name)
+                    continue
+                running[pool.submit(run_node, node)] = name
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                seconds, returncode, output = future.result()
+                if returncode:
+                    failed.append(name)
+                    print(f"{name:<22} FAILED ({returncode})\n{output}")
+                    continue
+                state[name] = fingerprint(nodes[name])
+                save_state(state)
+                done.add(name)
+                print(f"{name:<22} rebuilt in {seconds:.2f}s")
+            # Nodes downstream of a failure never become ready
+            blocked = set(failed)
+            for name in sorted(waiting, key=lambda name: len(with_dependencies([name], deps))):
+                if waiting[name] & blocked:
+                    print(f"{name:<22} skipped")
+                    blocked.add(name)
+                    del waiting[name]
+
+    print(f"Build finished in {time.perf_counter() - start:.2f}s"
+          + (f", {len(failed)} failed" if failed else ""))
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the out-of-date converter and corpus outputs.")
+    parser.add_argument("targets", nargs="*",
+                        help="nodes to build, e.g. convert:english corpus:CEB-BIK (default: all)")
+    parser.add_argument("--jobs", type=int, default=None, help="steps run at once (default: CPU count)")
+    parser.add_argument("--excel", action="store_true", help="converters also export their Excel sheets")
+    parser.add_argument("--force", action="store_true", help="rebuild even if up to date")
+    parser.add_argument("--dry-run", action="store_true", help="only list the stale steps")
+    args = parser.parse_args()
+    failed = build(args.targets, args.jobs, args.excel, args.force, args.dry_run)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Run every converter in CONVERTERS at once, one language per CPU core.
+
+    python PIPELINE/convert_all.py                 # all languages
+    python PIPELINE/convert_all.py english yami    # only some of them
+    python PIPELINE/convert_all.py --jobs 4
+    python PIPELINE/convert_all.py --excel         # also export the Excel sheets
+    python PIPELINE/convert_all.py --stats STATS   # STATS/<language>.json per language
+
+Each language writes its own files, so the outputs do not depend on which
+worker finishes first; the summary is printed in alphabetical order.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(base_dir))
+
+# Imported here so forked workers inherit the engine and pyarrow instead of importing them again
+from PIPELINE import engine
+from PIPELINE.instrumentation import NULL_INSTRUMENTS, Instruments
+
+converters_dir = base_dir / "CONVERTERS"
+
+
+def load_converter(path):
+    """Import a converter script by path and return its module."""
+    path = Path(path)
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def discover_converters():
+    """Return {language: script path} for every script that defines a PARSER plugin."""
+    found = {}
+    for path in sorted(converters_dir.glob("*.py")):
+        module = load_converter(path)
+        parser = getattr(module, "PARSER", None)
+        if isinstance(parser, engine.BibleParser):
+            found[parser.language] = path
+    return found
+
+
+def run_converter(path, excel=False, stats_dir=None):
+    """Worker: convert one language and return (language, seconds, output paths)."""
+    start = time.perf_counter()
+    parser = load_converter(path).PARSER
+    instruments = Instruments(parser.language) if stats_dir else NULL_INSTRUMENTS
+    outputs = engine.convert(parser, excel=excel, verbose=False, instruments=instruments)
+    if stats_dir:
+        outputs.append(instruments.write(Path(stats_dir) / f"{parser.language}.json"))
+    return parser.language, time.perf_counter() - start, outputs
+
+
+def convert_all(languages=None, jobs=None, excel=False, stats_dir=None):
+    converters = discover_converters()
+    if languages:
+        unknown = sorted(set(languages) - set(converters))
+        if unknown:
+            raise ValueError(f"Unknown languages: {unknown}")
+        converters = {lang: converters[lang] for lang in languages}
+
+    if excel:
+        import openpyxl  # noqa: F401  (loaded once here for the forked workers)
+
+    jobs = jobs or min(os.cpu_count() or 1, len(converters))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(partial(run_converter, excel=excel, stats_dir=stats_dir), converters.values()))
+    total = time.perf_counter() - start
+
+    for language, seconds, outputs in sorted(results):
+        print(f"{language:<12} {seconds:6.2f}s  " + ", ".join(p.name for p in outputs))
+    print(f"Converted {len(results)} languages in {total:.2f}s using {jobs} worker(s)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert every language in RAW_FILES in parallel.")
+    parser.add_argument("languages", nargs="*", help="languages to convert (default: all)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--excel", action="store_true", help="also export the *_bible_cleaned.xlsx files")
+    parser.add_argument("--stats", type=Path, default=None, metavar="DIR",
+                        help="write each language's stage timings and counters to DIR/<language>.json")
+    args = parser.parse_args()
+    convert_all(args.languages, args.jobs, args.excel, args.stats)
+
+
+if __name__ == "__main__":
+    main()
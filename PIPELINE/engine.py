@@ -0,0 +1,536 @@
+"""Streaming conversion engine shared by every language converter.
+
+Each script in CONVERTERS is a small parser plugin (a BibleParser subclass)
+that only knows its own raw layout.  The engine wires the plugin into a
+chain of generators:
+
+    read -> classify -> assemble -> clean -> segment -> sinks
+
+so a verse is written out as soon as it has been assembled and memory does
+not grow with the size of the input file.  Parsing and the text outputs
+need neither pandas nor openpyxl; they are only imported when an Excel
+export is requested.  The sinks are the verse store
+(see verse_store.py), the sentence file and, on request, an Excel export
+that is streamed to disk row by row (see excel_io.py).
+Every stored verse also goes into the memory-mapped lookup file (see
+verse_text_store.py).  Each sink writes beside its file and the files are
+only moved into place when the whole run succeeds.  segment() returns (start, end) spans into the verse
+text rather than new strings (see segmenter.py); iter_sentences() yields
+them with the verse key for sentence-level tools.
+
+The sentence file and the Excel export are fed through bounded queues to
+their own threads (BackgroundSink), so their formatting and disk writes
+overlap with parsing, and a slow writer makes the parser wait rather than
+letting verses pile up in memory.
+
+A converter whose book headers reset all of its parsing state declares
+them as `shard_re`; convert(jobs=N) then cuts the file at those headers
+and parses the pieces in N processes (see parsed_verses()), so one large
+file uses every core.
+"""
+import argparse
+import io
+import mmap
+import os
+import queue
+import re
+import sys
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import filterfalse, islice
+from pathlib import Path
+
+from PIPELINE.books import CANON, SOURCE_BOOKS
+from PIPELINE.excel_io import ExcelSink
+from PIPELINE.instrumentation import NULL_INSTRUMENTS, add_instrument_arguments, make_instruments
+from PIPELINE.segmenter import Segmenter
+from PIPELINE.verse_key import NO_KEY
+from PIPELINE.verse_store import VerseStoreSink, record_key, store_path
+from PIPELINE.verse_text_store import TextStoreSink, text_store_path
+
+# === BASE DIRECTORIES ===
+base_dir = Path(__file__).resolve().parent.parent  # project root
+raw_dir = base_dir / "RAW_FILES"
+converted_dir = base_dir / "CONVERTED_FILES"
+
+# One assembled verse.  `text` is raw coming out of assemble() and cleaned
+# after clean(); chapter/verse keep whatever type the language produces.
+# clean() may also fill in `spans`, the (start, end) of each sentence in the
+# cleaned text, when it cuts the verse up anyway (see normalizer.py).  A
+# verse range ("2-6a") is one Verse whose `verses` lists the verse labels
+# that share its text; `verse` is the first of them.
+Verse = namedtuple("Verse", ["book", "chapter", "verse", "text", "spans", "verses"],
+                   defaults=[None, None])
+
+# Verses handed to clean_batch() at a time
+batch_size = 512
+
+
+def expand(verse):
+    """One Verse per verse label: a range is repeated for each verse it covers."""
+    if not verse.verses:
+        return [verse]
+    return [verse._replace(verse=label, verses=None) for label in verse.verses]
+
+
+def read_lines(path, start=0, end=None):
+    """Yield the lines of a raw file one at a time, without the newline.
+
+    With `start`/`end` only the lines in that byte range are read (a shard,
+    see shard_offsets()).
+    """
+    if start or end is not None:
+        with open(path, "rb") as f:
+            f.seek(start)
+            data = f.read() if end is None else f.read(end - start)
+        # StringIO translates newlines the same way text-mode open() does
+        for line in io.StringIO(data.decode("utf-8"), newline=None):
+            yield line.rstrip("\n")
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
+def shard_offsets(parser, path, shards):
+    """Byte offsets cutting `path` into about `shards` pieces that parse independently.
+
+    Each cut is at a header line (parser.shard_re, confirmed with
+    parser.is_shard_start) near an even split of the file, so every shard
+    starts with the state assemble() would have reached there anyway.
+    Returns [0, ..., size]; a file with no usable header is one shard.
+    """
+    size = Path(path).stat().st_size
+    offsets = [0]
+    if parser.shard_re is None or shards < 2 or not size:
+        return offsets + [size]
+    header_re = re.compile(rf"(?m)^[ \t]*(?:{parser.shard_re})".encode("utf-8"))
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for m in header_re.finditer(data):
+            start = m.start()
+            if start < size * len(offsets) // shards or start == offsets[-1]:
+                continue
+            end = data.find(b"\n", start)
+            line = data[start:end if end != -1 else size].decode("utf-8")
+            if parser.is_shard_start(line):
+                offsets.append(start)
+                if len(offsets) == shards:
+                    break
+    return offsets + [size]
+
+
+def parse_shard(task):
+    """Worker: parse one byte range of a raw file and return [(cleaned, (text, spans)), ...].
+
+    The converter is imported afresh from its script in the worker process.
+    """
+    from PIPELINE.convert_all import load_converter
+
+    script, input_file, start, end, books, sentences = task
+    parser = load_converter(script).PARSER
+    parser.books = books
+    results = []
+    for raw, cleaned in parse_lines(parser, read_lines(input_file, start, end)):
+        results.append((cleaned, parser.segment(raw, cleaned) if sentences else None))
+    return results
+
+
+class BibleParser:
+    """Base class for a language plugin.
+
+    Subclasses set the file names and override the stages they need:
+    classify() sees one raw line at a time, assemble() turns the stream of
+    classified lines into Verse records, clean() produces the verse text and
+    segment() the sentence spans, to_record() maps a verse onto the
+    verse store and to_rows() lays it out in the optional Excel export.
+    The engine calls clean_batch(), which cleans a few hundred verses per
+    call.
+    """
+
+    language = None
+    raw_file = None
+    excel_file = None
+    sentences_file = None
+    columns = ["Book", "Chapter", "Verse", "Text"]
+
+    # Most sentence files end with a newline, a few were written with "\n".join
+    sentences_trailing_newline = True
+    # A range's sentences are listed once for every verse it covers; False
+    # lists them once per range
+    range_sentences_per_verse = True
+
+    # Book ids the input holds, in order; main() switches to CANON with
+    # --canon for a whole-Bible file (see BookTracker in books.py).  Only
+    # converters whose assemble() follows self.books set `canon` and get
+    # the flag; the others only know their three gospel headers.
+    books = SOURCE_BOOKS
+    canon = False
+
+    # main() sets this with --dump; converters with intermediate stages
+    # then also write them out for debugging
+    dump = False
+
+    def open(self, output_dir):
+        """Called once before the first line is read."""
+
+    def close(self):
+        """Called once after the last verse has been written."""
+
+    def classify(self, line):
+        return line
+
+    def assemble(self, items):
+        raise NotImplementedError
+
+    # A Normalizer (see normalizer.py) the default clean() applies to the text
+    normalizer = None
+    # Cuts the cleaned text into sentences (see segmenter.py); by default
+    # each non-empty verse is one sentence
+    segmenter = Segmenter()
+
+    def clean(self, verse):
+        if self.normalizer is None:
+            return verse
+        return verse._replace(text=self.normalizer(verse.text))
+
+    def clean_batch(self, verses):
+        """Clean a list of verses; with a normalizer the whole batch is one translate call."""
+        if self.normalizer is None:
+            return [self.clean(verse) for verse in verses]
+        texts = self.normalizer.clean_batch([verse.text for verse in verses])
+        return [verse._replace(text=text) for verse, text in zip(verses, texts)]
+
+    def segment(self, raw, cleaned):
+        """(text, spans): the text the sentences are cut from and their (start, end) in it."""
+        text = cleaned.text or ""
+        if cleaned.spans is not None:
+            return text, cleaned.spans
+        return text, self.segmenter.spans(text)
+
+    # Whole lines (surrounding whitespace allowed) that classify() always
+    # throws away and assemble() never needs to see: blank lines, page
+    # numbers, running headers.  parse_lines() drops them with one C-level
+    # regex call each, before any per-line Python code runs.
+    noise_re = None
+
+    # Regex for the header lines a file can be cut at for parallel parsing
+    # (see shard_offsets): lines after which assemble() needs nothing from
+    # the lines before.  None means the file is always parsed in one piece,
+    # and main() does not offer --jobs.
+    shard_re = None
+
+    def is_shard_start(self, line):
+        """True if a line matched by shard_re really is such a header."""
+        item = self.classify(line)
+        return isinstance(item, tuple) and item[0] == "book"
+
+    def keep(self, verse):
+        """Return False for assembled verses that should not be stored or exported."""
+        return True
+
+    def is_dropped(self, item):
+        """True if classify() threw the line away (blank, noise or a skip marker)."""
+        return not item or (isinstance(item, tuple) and item[0] == "skip")
+
+    def to_record(self, verse):
+        """(book, chapter, verse, text) for the verse store."""
+        return verse.book, verse.chapter, verse.verse, verse.text
+
+    def to_rows(self, verse):
+        yield [verse.book, verse.chapter, verse.verse, verse.text]
+
+
+class TextSink:
+    """Write lines to a text file as they arrive.
+
+    The lines go to `<name>.part`, which close() moves over the file and
+    abort() deletes, so a failed run leaves the previous file as it was.
+    """
+
+    def __init__(self, path, trailing_newline=True):
+        self.path = Path(path)
+        self.partial = self.path.with_name(self.path.name + ".part")
+        self.trailing_newline = trailing_newline
+        self.count = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.partial, "w", encoding="utf-8")
+
+    def write(self, line):
+        if self.count and not self.trailing_newline:
+            self.file.write("\n")
+        self.file.write(line)
+        if self.trailing_newline:
+            self.file.write("\n")
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+        os.replace(self.partial, self.path)
+
+    def abort(self):
+        self.file.close()
+        self.partial.unlink()
+
+
+class BackgroundSink:
+    """Run a sink's writes on its own thread, fed through a bounded queue.
+
+    write() only collects its arguments; every `batch_size` writes the batch
+    is queued and the thread replays it on the wrapped sink, so parsing
+    carries on while the sink formats and writes.  The queue holds at most
+    `maxsize` batches: when a slow sink falls that far behind, write()
+    blocks until it catches up instead of letting verses pile up in memory.
+    An error in the sink is raised again by close().
+    """
+
+    def __init__(self, sink, maxsize=8, batch_size=batch_size):
+        self.sink = sink
+        self.path = sink.path
+        self.batch_size = batch_size
+        self.batch = []
+        self.error = None
+        self.aborted = False
+        self.queue = queue.Queue(maxsize)
+        self.thread = threading.Thread(target=self._run, name=f"sink:{self.path.name}", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            batch = self.queue.get()
+            if batch is None:
+                return
+            if self.error is None and not self.aborted:
+                try:
+                    for args in batch:
+                        self.sink.write(*args)
+                except BaseException as error:  # re-raised by close()
+                    self.error = error
+
+    def write(self, *args):
+        self.batch.append(args)
+        if len(self.batch) >= self.batch_size:
+            self.queue.put(self.batch)
+            self.batch = []
+
+    def close(self):
+        if self.batch:
+            self.queue.put(self.batch)
+            self.batch = []
+        self.queue.put(None)
+        self.thread.join()
+        try:
+            self.sink.close()
+        finally:
+            # The sink's own error comes first; it is why the output is incomplete
+            if self.error is not None:
+                raise self.error
+
+    def abort(self):
+        """Stop the thread without writing what is still queued, and abort the sink."""
+        self.aborted = True
+        self.batch = []
+        self.queue.put(None)
+        self.thread.join()
+        self.sink.abort()
+
+
+def close_sinks(closers, instruments, failed=False):
+    """Call every (stage, close) in order, even when an earlier one raises.
+
+    The first error is raised after all of them have run, unless the run
+    already `failed`: then close errors are dropped so that they do not
+    replace the exception that stopped it.
+    """
+    first_error = None
+    for stage, close in closers:
+        try:
+            with instruments.stage(stage):
+                close()
+        except Exception as error:
+            if first_error is None:
+                first_error = error
+    if first_error is not None and not failed:
+        raise first_error
+
+
+def iter_verses(parser, input_file=None, instruments=NULL_INSTRUMENTS):
+    """Run read -> classify -> assemble -> clean and yield (raw, cleaned) pairs."""
+    input_file = input_file or raw_dir / parser.raw_file
+    lines = instruments.timed("read", read_lines(input_file), counter="lines")
+    return parse_lines(parser, lines, instruments)
+
+
+def parse_lines(parser, lines, instruments=NULL_INSTRUMENTS):
+    """classify -> assemble -> clean over an iterable of raw lines."""
+    if parser.noise_re is not None:
+        noise = re.compile(rf"\s*(?:{parser.noise_re})\s*").fullmatch
+        lines = filterfalse(noise, instruments.watch(lines, "dropped_lines", noise))
+    classified = instruments.timed("classify", map(parser.classify, lines))
+    classified = instruments.watch(classified, "dropped_lines", parser.is_dropped)
+    verses = instruments.timed("assemble", parser.assemble(classified), counter="verses")
+    while True:
+        batch = list(islice(verses, batch_size))
+        if not batch:
+            return
+        with instruments.stage("clean"):
+            cleaned = parser.clean_batch(batch)
+        yield from zip(batch, cleaned)
+
+
+def iter_sentences(parser, input_file=None, instruments=NULL_INSTRUMENTS):
+    """Yield (key, start, end, text) for every sentence of the input.
+
+    `text` is the string the sentence was cut from, shared by all the
+    sentences of a verse, so text[start:end] is the sentence and `key` the
+    packed key of its verse (NO_KEY for verses the converter does not store).
+    """
+    for raw, cleaned in iter_verses(parser, input_file, instruments):
+        # A range's sentences are listed once, under its first verse
+        key = record_key(*parser.to_record(cleaned)[:3]) if parser.keep(cleaned) else NO_KEY
+        text, spans = parser.segment(raw, cleaned)
+        for start, end in spans:
+            yield key, start, end, text
+
+
+def parsed_verses(parser, input_file, sentences, jobs=1, instruments=NULL_INSTRUMENTS):
+    """Yield (cleaned verse, (text, spans) or None) for the whole input, in order.
+
+    With jobs > 1 and a parser that declares shard_re, the file is cut at
+    header lines into a few shards per process, the shards are parsed in a
+    process pool and their verses are handed on in file order.  Only
+    jobs + 1 shards are in flight at a time: the next one is submitted as
+    the oldest is handed on, so a slow sink holds the workers back instead
+    of letting parsed shards pile up.
+    """
+    input_file = Path(input_file or raw_dir / parser.raw_file)
+    offsets = shard_offsets(parser, input_file, jobs * 4) if jobs > 1 else [0]
+    if len(offsets) < 3:
+        for raw, cleaned in iter_verses(parser, input_file, instruments):
+            segmented = None
+            if sentences:
+                with instruments.stage("segment"):
+                    segmented = parser.segment(raw, cleaned)
+            yield cleaned, segmented
+        return
+
+    script = Path(sys.modules[type(parser).__module__].__file__).resolve()
+    tasks = [(script, input_file, start, end, parser.books, sentences)
+             for start, end in zip(offsets, offsets[1:])]
+    tasks = iter(tasks)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque(pool.submit(parse_shard, task) for task in islice(tasks, jobs + 1))
+        while pending:
+            with instruments.stage("parse_shards"):
+                results = pending.popleft().result()
+            for task in islice(tasks, 1):
+                pending.append(pool.submit(parse_shard, task))
+            instruments.count("verses", len(results))
+            yield from results
+
+
+def convert(parser, input_file=None, output_dir=None, excel=False, verbose=True,
+            instruments=NULL_INSTRUMENTS, jobs=1):
+    """Convert one language: stream its raw file into the verse store and sentence file.
+
+    The Excel sheet is only written when `excel` is true.  Stage times and
+    counts are reported to `instruments` (see instrumentation.py).  With
+    jobs > 1 a converter that supports it parses its file in that many
+    processes (see parsed_verses()).  Returns the paths that were written.
+    """
+    output_dir = Path(output_dir) if output_dir else converted_dir
+    input_file = Path(input_file or raw_dir / parser.raw_file)
+    if not input_file.is_file():
+        raise FileNotFoundError(f"raw file not found: {input_file}")
+    store = VerseStoreSink(store_path(parser.language, output_dir), parser.language)
+    text_store = TextStoreSink(text_store_path(parser.language, output_dir))
+    sinks = [store, text_store]
+    excel_sink = None
+    if excel:
+        excel_sink = BackgroundSink(ExcelSink(output_dir / parser.excel_file, parser.columns))
+        sinks.append(excel_sink)
+    sentences = None
+    if parser.sentences_file:
+        sentences = BackgroundSink(TextSink(output_dir / parser.sentences_file,
+                                            parser.sentences_trailing_newline))
+        sinks.append(sentences)
+
+    failed = True
+    parser.open(output_dir)
+    try:
+        for cleaned, segmented in parsed_verses(parser, input_file, sentences is not None,
+                                                 jobs, instruments):
+            # A range is stored, cleaned and segmented once; only the
+            # per-verse outputs repeat it for every verse it covers
+            verses = expand(cleaned)
+            if parser.keep(cleaned):
+                with instruments.stage("store"):
+                    book, chapter, number, text = parser.to_record(cleaned)
+                    text = "" if text is None else str(text)
+                    last = cleaned.verses[-1] if cleaned.verses else None
+                    key = store.write(book, chapter, number, text, last)
+                    text_store.write(key, text)
+                    for verse in verses[1:]:
+                        text_store.write(record_key(*parser.to_record(verse)[:3]), text)
+                if excel_sink is not None:
+                    with instruments.stage("excel"):
+                        for verse in verses:
+                            for row in parser.to_rows(verse):
+                                excel_sink.write(row)
+            else:
+                instruments.count("dropped_verses", len(verses))
+            if sentences is not None:
+                text, spans = segmented
+                copies = len(verses) if parser.range_sentences_per_verse else 1
+                instruments.count("sentences", len(spans) * copies)
+                with instruments.stage("sentences"):
+                    for _ in range(copies):
+                        for start, end in spans:
+                            sentences.write(text[start:end])
+        failed = False
+    finally:
+        # Every sink writes beside its file and only a finished run moves the
+        # files into place; a failed one drops them and keeps the old outputs
+        closers = [("assemble", parser.close)]
+        for stage, sink in [("sentences", sentences), ("store", store), ("excel", excel_sink),
+                            ("text_store", text_store)]:
+            if sink is not None:
+                closers.append((stage, sink.abort if failed else sink.close))
+        close_sinks(closers, instruments, failed)
+
+    outputs = [sink.path for sink in sinks]
+    instruments.finish()
+    if verbose:
+        for path in outputs:
+            print(f"Saved -> {path}")
+    return outputs
+
+
+def main(parser):
+    """Command line entry point shared by the converter scripts."""
+    arg_parser = argparse.ArgumentParser(description=f"Convert the {parser.language} raw text.")
+    arg_parser.add_argument("--input", type=Path, default=None,
+                            help=f"raw text file (default: RAW_FILES/{parser.raw_file})")
+    arg_parser.add_argument("--output-dir", type=Path, default=None,
+                            help="output folder (default: CONVERTED_FILES)")
+    arg_parser.add_argument("--excel", action="store_true",
+                            help=f"also export {parser.excel_file}")
+    arg_parser.add_argument("--dump", action="store_true",
+                            help="also write the converter's intermediate stage files, if it has any")
+    if parser.canon:
+        arg_parser.add_argument("--canon", action="store_true",
+                                help="the input is a whole Bible (66 books) rather than the three gospels")
+    if parser.shard_re is not None:
+        arg_parser.add_argument("--jobs", type=int, default=1,
+                                help="parse the file in this many processes, cut at its book headers "
+                                     "(default: 1)")
+    add_instrument_arguments(arg_parser)
+    args = arg_parser.parse_args()
+    if getattr(args, "canon", False):
+        parser.books = CANON
+    parser.dump = args.dump
+    instruments = make_instruments(args, parser.language)
+    convert(parser, args.input, args.output_dir, excel=args.excel, instruments=instruments,
+            jobs=getattr(args, "jobs", 1))
+    if args.stats:
+        print(f"Saved -> {instruments.write(args.stats)}")
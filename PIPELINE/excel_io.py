@@ -0,0 +1,95 @@
+"""Streaming .xlsx output for the converters and the corpus builders, and streaming input.
+
+pd.DataFrame(rows).to_excel() needs the whole table as a DataFrame and then
+builds openpyxl's full workbook model (one Cell object, with its style, per
+value) before anything is written.  ExcelSink instead opens a write-only
+workbook: each row is serialized to the sheet's temporary XML as soon as
+it is appended, so only the workbook's shared string table stays in
+memory.  The file has the same layout as the pandas export (sheet
+"Sheet1", a bold, bordered header row, one row per call to write()), and
+pandas.read_excel() reads it back unchanged.  read_rows() is the reverse: it
+yields a sheet's rows from a read-only workbook without loading the file.
+"""
+import os
+from pathlib import Path
+
+# The header style DataFrame.to_excel() uses
+header_font = {"bold": True}
+header_alignment = {"horizontal": "center", "vertical": "top"}
+chunk_size = 4096
+
+
+class ExcelSink:
+    """Write rows to an .xlsx file as they arrive (imports openpyxl)."""
+
+    def __init__(self, path, columns, sheet_name="Sheet1"):
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Alignment, Border, Font, Side
+
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.count = 0
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(sheet_name)
+
+        side = Side(style="thin")
+        header = []
+        for column in self.columns:
+            cell = WriteOnlyCell(self.sheet, value=column)
+            cell.font = Font(**header_font)
+            cell.border = Border(left=side, right=side, top=side, bottom=side)
+            cell.alignment = Alignment(**header_alignment)
+            header.append(cell)
+        self.sheet.append(header)
+
+    def write(self, row):
+        self.sheet.append(row)
+        self.count += 1
+
+    def close(self):
+        # Saved beside the file and moved over it, so a failed save keeps the old sheet
+        partial = self.path.with_name(self.path.name + ".part")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.workbook.save(partial)
+        os.replace(partial, self.path)
+
+    def abort(self):
+        """Drop the rows without writing the file."""
+        self.sheet.close()
+
+
+def write_frame(table, path, chunk_size=chunk_size):
+    """Stream a DataFrame into an .xlsx file with ExcelSink, `chunk_size` rows at a time.
+
+    Missing values become empty cells, as with to_excel().  Returns the
+    number of rows written.
+    """
+    import pandas as pd
+
+    sink = ExcelSink(path, [str(column) for column in table.columns])
+    for start in range(0, len(table), chunk_size):
+        chunk = table.iloc[start:start + chunk_size]
+        chunk = chunk.astype(object).where(pd.notna(chunk), None)
+        for row in chunk.itertuples(index=False, name=None):
+            sink.write(row)
+    sink.close()
+    return sink.count
+
+
+def read_rows(path):
+    """Yield the rows of an .xlsx file's first sheet as dicts keyed by its header.
+
+    The workbook is opened read-only, so rows are parsed from the sheet's
+    XML as they are iterated and the file is never loaded whole.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, ())
+        for row in rows:
+            yield dict(zip(header, row))
+    finally:
+        workbook.close()
@@ -0,0 +1,165 @@
+"""Stage timers and counters for converter and corpus runs.
+
+    instruments = Instruments("english", progress=True)
+    lines = instruments.timed("read", read_lines(path), counter="lines")
+    with instruments.stage("excel"):
+        ...
+    instruments.count("sentences")
+    instruments.write("english_stats.json")
+
+timed() wraps a generator stage and charges each stage only for its own
+time: when "classify" pulls a line from "read", the time spent inside
+"read" is not counted again for "classify".  Code that does not want
+instrumentation passes NULL_INSTRUMENTS, whose timed() returns the
+iterable unchanged and whose other methods do nothing, so a disabled run
+pays one no-op call per verse at most.
+"""
+import json
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+
+
+class Instruments:
+    """Collect per-stage self time and named counters for one run."""
+
+    enabled = True
+
+    def __init__(self, name, progress=False, stream=None, interval=0.5):
+        self.name = name
+        self.progress = progress
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.stages = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.started = datetime.now()
+        self._start = time.perf_counter()
+        self._last_progress = self._start
+        # Time spent in nested stages, one entry per stage currently running
+        self._children = []
+
+    def _enter(self):
+        self._children.append(0.0)
+        return time.perf_counter()
+
+    def _exit(self, name, start):
+        elapsed = time.perf_counter() - start
+        self.stages[name] += elapsed - self._children.pop()
+        if self._children:
+            self._children[-1] += elapsed
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block of code as `name`."""
+        start = self._enter()
+        try:
+            yield
+        finally:
+            self._exit(name, start)
+
+    def timed(self, name, iterable, counter=None):
+        """Yield from `iterable`, timing each step as `name` and counting items in `counter`."""
+        iterator = iter(iterable)
+        while True:
+            start = self._enter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self._exit(name, start)
+                return
+            self._exit(name, start)
+            if counter:
+                self.count(counter)
+            yield item
+
+    def watch(self, iterable, counter, predicate):
+        """Yield from `iterable`, counting the items for which predicate(item) is true."""
+        for item in iterable:
+            if predicate(item):
+                self.count(counter)
+            yield item
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+        if self.progress:
+            now = time.perf_counter()
+            if now - self._last_progress >= self.interval:
+                self._last_progress = now
+                self.show_progress(now)
+
+    def show_progress(self, now=None):
+        seconds = (now or time.perf_counter()) - self._start
+        counts = ", ".join(f"{value:,} {key}" for key, value in self.counters.items())
+        rate = ""
+        if "lines" in self.counters and seconds:
+            rate = f"{self.counters['lines'] / seconds:,.0f} lines/s, "
+        self.stream.write(f"\r{self.name}: {counts}  ({rate}{seconds:.1f}s)")
+        self.stream.flush()
+
+    def report(self):
+        """The run as a JSON-serialisable dict."""
+        seconds = time.perf_counter() - self._start
+        lines = self.counters.get("lines", 0)
+        return {
+            "name": self.name,
+            "started": self.started.isoformat(timespec="seconds"),
+            "seconds": round(seconds, 6),
+            "lines_per_second": round(lines / seconds, 1) if lines and seconds else None,
+            "stages": {key: round(value, 6) for key, value in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+    def finish(self):
+        """End the progress line, if one is being shown."""
+        if self.progress:
+            self.show_progress()
+            self.stream.write("\n")
+
+    def write(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2), encoding="utf-8")
+        return path
+
+
+class NullInstruments:
+    """Drop-in Instruments that records nothing."""
+
+    enabled = False
+    _block = nullcontext()
+
+    def stage(self, name):
+        return self._block
+
+    def timed(self, name, iterable, counter=None):
+        return iterable
+
+    def watch(self, iterable, counter, predicate):
+        return iterable
+
+    def count(self, name, n=1):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_INSTRUMENTS = NullInstruments()
+
+
+def add_instrument_arguments(arg_parser):
+    """Add the --stats and --progress options to a script's argument parser."""
+    arg_parser.add_argument("--stats", type=Path, default=None, metavar="JSON",
+                            help="write stage timings and counters to this file")
+    arg_parser.add_argument("--progress", action="store_true",
+                            help="show a live progress line on stderr")
+
+
+def make_instruments(args, name):
+    """Instruments for a run started with --stats/--progress, NULL_INSTRUMENTS otherwise."""
+    if args.stats or args.progress:
+        return Instruments(name, progress=args.progress)
+    return NULL_INSTRUMENTS
@@ -0,0 +1,51 @@
+"""One-pass line classification for the converter plugins.
+
+A converter lists its line rules in priority order, each a kind and a
+regular expression anchored at the start of the line:
+
+    classifier = LineClassifier([
+        ("skip", r"(?:\d+|Central Bikol|)$"),
+        ("book", r"(?P<book>Mateo|Lukas|Markos)\s+(?P<chapter>\d+)"),
+        ("range", r"(?P<start>\d+)-(?P<end>\d+)(?P<text>.*)"),
+        ("verse", r"(?P<number>\d+)(?P<text>.*)"),
+    ])
+    classifier.classify("12-13Dangan...")
+    # -> ("range", {"start": "12", "end": "13", "text": "Dangan..."})
+
+The rules are compiled into a single alternation with one named group per
+rule, so each line is scanned once and the regex engine itself picks the
+first rule that matches.  Named groups inside a rule become the fields of
+the result; a line that matches no rule is (default, {"text": line}).
+"""
+import re
+
+group_name_re = re.compile(r"\(\?P<(\w+)>")
+group_ref_re = re.compile(r"\(\?P=(\w+)\)")
+
+
+class LineClassifier:
+    """Compile ordered (kind, pattern) rules into one regex."""
+
+    def __init__(self, rules, default="text", flags=0):
+        self.default = default
+        self.rules = {}
+        alternatives = []
+        for i, (kind, pattern) in enumerate(rules):
+            # Group names must be unique across the whole regex, so prefix each
+            # rule's groups with the rule's own tag and map them back afterwards
+            tag = f"r{i}"
+            fields = group_name_re.findall(pattern)
+            pattern = group_name_re.sub(lambda m: f"(?P<{tag}_{m.group(1)}>", pattern)
+            pattern = group_ref_re.sub(lambda m: f"(?P={tag}_{m.group(1)})", pattern)
+            alternatives.append(f"(?P<{tag}>{pattern})")
+            self.rules[tag] = (kind, [(f"{tag}_{field}", field) for field in fields])
+        self.regex = re.compile("|".join(alternatives), flags)
+
+    def classify(self, line):
+        """Return (kind, fields) for the first rule matching at the start of `line`."""
+        m = self.regex.match(line)
+        if m is None:
+            return self.default, {"text": line}
+        # The rule's outer group closes after its fields, so it is lastgroup
+        kind, fields = self.rules[m.lastgroup]
+        return kind, {field: m.group(group) for group, field in fields}
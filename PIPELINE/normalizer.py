@@ -0,0 +1,139 @@
+"""Punctuation stripping shared by the converter plugins.
+
+A Normalizer is built from the character class a converter used to strip
+with re.sub and applies it with str.translate instead:
+
+    letters = Normalizer(r"[^A-Za-z\\s]")
+    letters("Jesus wept.")                      # -> "Jesus wept"
+    letters.clean_batch(texts)                  # a whole batch in one call
+    letters.clean_series(frame["Text"])         # pandas Series, vectorised
+
+The translate table decides each code point once, by matching the original
+class against it, and remembers the answer, so the result is exactly what
+the re.sub gave.  Tables are shared by every Normalizer with the same class,
+so e.g. Cebuano, Chavacano and Bikolano build one between them.
+
+A converter that writes both a cleaned verse and its sentences cleans a
+batch of verses once with split_batch(), which cuts each raw text into
+sentences, translates all the pieces in a single call and returns every
+cleaned verse together with the span of each sentence in it.
+"""
+import re
+
+# Joins the texts of a batch so they can be translated in one call; no
+# Bible text contains it
+SEP = "\x00"
+
+
+class TranslateTable(dict):
+    """str.translate table deleting the characters matched by `pattern`.
+
+    Entries are filled in the first time translate() asks for a code point.
+    """
+
+    def __init__(self, pattern, keep=""):
+        super().__init__((ord(ch), ord(ch)) for ch in keep)
+        self.pattern = pattern
+
+    def __missing__(self, code):
+        value = None if self.pattern.match(chr(code)) else code
+        self[code] = value
+        return value
+
+
+_tables = {}
+_splitters = {}
+
+
+def _splitter(split_re):
+    # The same pattern with the separator captured, so re.split keeps it
+    if split_re not in _splitters:
+        _splitters[split_re] = re.compile(f"({split_re.pattern})", split_re.flags)
+    return _splitters[split_re]
+
+
+def translate_tables(delete):
+    """(table, batch table) for a character class; the batch table also keeps SEP."""
+    if delete not in _tables:
+        pattern = re.compile(delete)
+        _tables[delete] = TranslateTable(pattern), TranslateTable(pattern, keep=SEP)
+    return _tables[delete]
+
+
+class Normalizer:
+    """Delete one character class, then optionally squeeze whitespace and strip.
+
+    `delete` is a single-character regex class such as r"[^A-Za-z\\s]".
+    With squeeze=True runs of whitespace become one space (and the result
+    is stripped); with strip=False the text is left unstripped.
+    """
+
+    def __init__(self, delete, squeeze=False, strip=True):
+        self.delete = delete
+        self.squeeze = squeeze
+        self.strip = strip
+        self.table, self.batch_table = translate_tables(delete)
+
+    def finish(self, text):
+        if self.squeeze:
+            return " ".join(text.split())
+        return text.strip() if self.strip else text
+
+    def __call__(self, text):
+        return self.finish(text.translate(self.table))
+
+    def translate_batch(self, texts):
+        """Translate a list of texts with one str.translate call (no squeeze/strip)."""
+        joined = SEP.join(texts)
+        if joined.count(SEP) != len(texts) - 1:
+            # A text contains SEP itself, so it cannot be used to split them
+            return [text.translate(self.table) for text in texts]
+        return joined.translate(self.batch_table).split(SEP)
+
+    def clean_batch(self, texts):
+        """Normalise a list of texts; same result as [self(text) for text in texts]."""
+        texts = list(texts)
+        if not texts:
+            return []
+        return [self.finish(text) for text in self.translate_batch(texts)]
+
+    def clean_series(self, series):
+        """Normalise a pandas Series of strings."""
+        series = series.str.translate(self.table)
+        if self.squeeze:
+            return series.str.split().str.join(" ")
+        return series.str.strip() if self.strip else series
+
+    def split_batch(self, texts, split_re):
+        """Clean each text once and cut it into sentence pieces at `split_re`.
+
+        Returns one (cleaned text, pieces) pair per text, where pieces is a
+        list of (raw piece, start, end): the piece of the raw text and the
+        span of its cleaned, stripped form in the cleaned text (see
+        segmenter.py).  The cleaned text is what self(text) returns: the
+        separators are translated along with the pieces, so nothing is
+        cleaned twice.
+        """
+        splitter = _splitter(split_re)
+        parts, shapes = [], []
+        for text in texts:
+            # [piece, separator, piece, ..., piece]
+            split = splitter.split(text)
+            parts.extend(split)
+            shapes.append(len(split))
+        translated = self.translate_batch(parts) if parts else []
+
+        results, start = [], 0
+        for n in shapes:
+            raw, clean = parts[start:start + n], translated[start:start + n]
+            start += n
+            text = self.finish("".join(clean))
+            pieces, pos = [], 0
+            for i in range(0, n, 2):
+                piece = " ".join(clean[i].split()) if self.squeeze else clean[i].strip()
+                if piece:
+                    pos = text.find(piece, pos)
+                pieces.append((raw[i], pos, pos + len(piece)))
+                pos += len(piece)
+            results.append((text, pieces))
+        return results
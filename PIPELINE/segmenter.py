@@ -0,0 +1,58 @@
+"""Sentence segmentation as spans into the verse text.
+
+Instead of building a new string per sentence, a Segmenter returns where
+each sentence sits in the text it was cut from:
+
+    segmenter = Segmenter(re.compile(r"(?<=[.!?])\\s+"))
+    segmenter.spans("In the beginning. And God said.")
+    # -> [(0, 17), (18, 31)]
+    segmenter.segment_batch(keys, texts)
+    # -> [(key, start, end), ...] for every sentence of every verse
+
+A sentence is the text between two matches of the separator with the
+surrounding whitespace left out.  Empty sentences are dropped unless the
+segmenter is built with keep_empty=True, which the converters that write
+one line per verse (blank or not) use.  Without a separator the whole
+verse is one sentence.
+
+The engine writes text[start:end] for each span straight to the sentence
+file, and iter_sentences() in engine.py hands the spans to other code
+together with the verse key, so every sentence can be traced back to its
+verse.
+"""
+
+
+class Segmenter:
+    """Cut texts into sentences at `split_re`, returning (start, end) spans."""
+
+    def __init__(self, split_re=None, keep_empty=False):
+        self.split_re = split_re
+        self.keep_empty = keep_empty
+
+    def _span(self, text, start, end, spans):
+        piece = text[start:end]
+        stripped = piece.strip()
+        if stripped or self.keep_empty:
+            start += len(piece) - len(piece.lstrip())
+            spans.append((start, start + len(stripped)))
+
+    def spans(self, text):
+        """(start, end) of every sentence of `text`, in order."""
+        spans = []
+        if not text:
+            if self.keep_empty:
+                spans.append((0, 0))
+            return spans
+        start = 0
+        if self.split_re is not None:
+            for m in self.split_re.finditer(text):
+                self._span(text, start, m.start(), spans)
+                start = m.end()
+        self._span(text, start, len(text), spans)
+        return spans
+
+    def segment_batch(self, keys, texts):
+        """(key, start, end) for every sentence of every text, in order."""
+        return [(key, start, end)
+                for key, text in zip(keys, texts)
+                for start, end in self.spans(text)]
@@ -0,0 +1,154 @@
+"""Packed integer verse keys and a compact column accumulator for verses.
+
+A verse reference is packed into one integer:
+
+    bits 25+     book id (1-66, see books.py)
+    bits 15-24   chapter (0-1023)
+    bits 5-14    verse   (0-1023)
+    bits 0-4     sub-verse letter (0 = none, 1 = "a", 2 = "b", ...)
+
+Keys sort in canon order and two translations refer to the same verse
+exactly when their keys are equal, so corpus joins are integer hash joins.
+Key 0 never encodes a real verse and is used for "no reference".
+
+A verse range ("2-6a") is one text under a pair of keys, the first and the
+last verse it covers; expand_ranges() turns such pairs back into one key
+per verse when a consumer needs them.
+
+numpy and pyarrow are imported by the functions that need them, so the
+key arithmetic is available to code (such as the .vtx reader) that never
+touches a column.
+"""
+from array import array
+
+from PIPELINE.books import BOOK_NAMES, book_id
+
+BOOK_SHIFT = 25
+CHAPTER_SHIFT = 15
+VERSE_SHIFT = 5
+FIELD_MASK = 0x3FF  # 10 bits for chapter and verse
+PART_MASK = 0x1F  # 5 bits for the sub-verse letter
+
+NO_KEY = 0
+PART_LETTERS = [""] + [chr(c) for c in range(ord("a"), ord("z") + 1)]
+
+
+def encode(book, chapter, verse, part=""):
+    """Pack (book id, chapter, verse, letter) into a key."""
+    part_code = ord(part) - ord("a") + 1 if part else 0
+    return (book << BOOK_SHIFT) | (chapter << CHAPTER_SHIFT) | (verse << VERSE_SHIFT) | part_code
+
+
+def decode(key):
+    """Unpack a key into (book id, chapter, verse, letter)."""
+    return (
+        key >> BOOK_SHIFT,
+        (key >> CHAPTER_SHIFT) & FIELD_MASK,
+        (key >> VERSE_SHIFT) & FIELD_MASK,
+        PART_LETTERS[key & PART_MASK],
+    )
+
+
+def make_key(book, chapter, verse, part=""):
+    """Key for a book *name* and numbers, or NO_KEY if any of them is unknown."""
+    bid = book_id(book)
+    if bid is None or chapter is None or verse is None:
+        return NO_KEY
+    if chapter > FIELD_MASK or verse > FIELD_MASK:
+        return NO_KEY
+    return encode(bid, chapter, verse, part)
+
+
+def validity_bitmap(valid):
+    """Arrow validity buffer for a boolean numpy array (None when nothing is null)."""
+    import numpy as np
+    import pyarrow as pa
+
+    if valid.all():
+        return None
+    return pa.py_buffer(np.packbits(valid, bitorder="little").tobytes())
+
+
+def decode_columns(keys):
+    """Vectorized decode of an integer array into Book, Chapter, Verse, Part columns."""
+    import numpy as np
+
+    keys = np.asarray(keys, dtype=np.int64)
+    return {
+        "Book": np.asarray(BOOK_NAMES, dtype=object)[keys >> BOOK_SHIFT],
+        "Chapter": (keys >> CHAPTER_SHIFT) & FIELD_MASK,
+        "Verse": (keys >> VERSE_SHIFT) & FIELD_MASK,
+        "Part": np.asarray(PART_LETTERS, dtype=object)[keys & PART_MASK],
+    }
+
+
+def expand_ranges(keys, end_keys):
+    """Vectorized expansion of (key, end key) pairs into one key per verse.
+
+    Returns (rows, keys): for every verse, the index of the pair it came from
+    and its own key.  A pair covers the verses from the first to the last
+    verse number of the same chapter; the first keeps the start's letter and
+    the last the end's ("2-6a" -> 2, 3, 4, 5, 6a).  Pairs with equal keys,
+    and NO_KEY, give a single row.
+    """
+    import numpy as np
+
+    keys = np.asarray(keys, dtype=np.int64)
+    end_keys = np.asarray(end_keys, dtype=np.int64)
+    first = (keys >> VERSE_SHIFT) & FIELD_MASK
+    last = (end_keys >> VERSE_SHIFT) & FIELD_MASK
+    counts = np.where((end_keys > keys) & (keys != NO_KEY), last - first + 1, 1).clip(1)
+
+    rows = np.repeat(np.arange(len(keys)), counts)
+    # Position of each verse within its range
+    offset = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    base = keys[rows] & ~np.int64((FIELD_MASK << VERSE_SHIFT) | PART_MASK)
+    part = np.where(offset == 0, keys[rows] & PART_MASK,
+                    np.where(offset == counts[rows] - 1, end_keys[rows] & PART_MASK, 0))
+    expanded = np.where(keys[rows] == NO_KEY, NO_KEY,
+                        base | ((first[rows] + offset) << VERSE_SHIFT) | part)
+    return rows, expanded
+
+
+class VerseTable:
+    """Array-backed columns for a run of verses.
+
+    Keys live in int64 arrays and all texts share one UTF-8 buffer with an
+    offsets array, so a verse costs three machine words plus its text bytes
+    instead of a dict per row.  A range is one entry whose end key is the
+    last verse it covers; for a single verse the end key is the key itself.
+    The buffers convert to Arrow without copying.
+    """
+
+    def __init__(self):
+        self.keys = array("q")
+        self.end_keys = array("q")
+        self.offsets = array("q", [0])
+        self.data = bytearray()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def append(self, key, text, end_key=None):
+        self.keys.append(key)
+        self.end_keys.append(key if end_key is None else end_key)
+        self.data += text.encode("utf-8")
+        self.offsets.append(len(self.data))
+
+    def key_array(self, end=False):
+        """Keys (or end keys) as an Arrow int64 array with NO_KEY turned into nulls."""
+        import numpy as np
+        import pyarrow as pa
+
+        values = self.end_keys if end else self.keys
+        # from_buffers rather than pa.array(), which would import pandas
+        keys = np.frombuffer(values, dtype=np.int64) if len(values) else np.zeros(0, np.int64)
+        return pa.Array.from_buffers(pa.int64(), len(keys),
+                                     [validity_bitmap(keys != NO_KEY), pa.py_buffer(values)])
+
+    def text_array(self):
+        """Texts as an Arrow large_string array backed by this table's buffers."""
+        import pyarrow as pa
+
+        return pa.LargeStringArray.from_buffers(
+            len(self.keys), pa.py_buffer(self.offsets), pa.py_buffer(self.data))
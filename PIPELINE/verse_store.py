@@ -0,0 +1,202 @@
+"""Typed columnar verse store, the pipeline's interchange format.
+
+Every converter writes CONVERTED_FILES/<language>_verses.parquet next to its
+sentence file.  The columns are the same for every language:
+
+    language  string
+    book      string   book name as written in that translation
+    key       int64    packed verse key (see verse_key.py), null if unknown
+    end_key   int64    key of the last verse of a range ("2-6a" -> 6a), else = key
+    chapter   int16    null when the source has no chapter number
+    verse     int16    null when the source has no verse number
+    part      string   sub-verse letter ("6a" -> verse 6, part "a"), "" if none
+    text      string   cleaned verse text, as in the Excel export
+
+A range is stored once, with chapter/verse/part describing its first verse;
+expand_table() repeats it for every verse it covers when a consumer wants
+one row per verse.  Rows are written in row groups while the converter
+runs, so the writer never holds more than one batch, and each batch is
+kept in array-backed columns (VerseTable) rather than a dict per row.  The
+corpus builders read the store back with read_table(), which is much
+faster than pd.read_excel.
+"""
+import os
+import re
+from array import array
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from PIPELINE.verse_key import (FIELD_MASK, NO_KEY, PART_LETTERS, PART_MASK, VERSE_SHIFT, VerseTable,
+                                expand_ranges, make_key, validity_bitmap)
+
+base_dir = Path(__file__).resolve().parent.parent
+converted_dir = base_dir / "CONVERTED_FILES"
+
+schema = pa.schema([
+    ("language", pa.string()),
+    ("book", pa.string()),
+    ("key", pa.int64()),
+    ("end_key", pa.int64()),
+    ("chapter", pa.int16()),
+    ("verse", pa.int16()),
+    ("part", pa.string()),
+    ("text", pa.large_string()),
+])
+
+verse_label_re = re.compile(r"^\s*(\d+)\s*([a-z]?)\s*$", re.IGNORECASE)
+
+
+def store_path(language, directory=None):
+    return Path(directory or converted_dir) / f"{language}_verses.parquet"
+
+
+def parse_number(value):
+    """Split a chapter/verse value ("3", 3, "6a", "", None) into (number, letter)."""
+    if isinstance(value, int):
+        return value, ""
+    m = verse_label_re.match(str(value)) if value is not None else None
+    if not m:
+        return None, ""
+    return int(m.group(1)), m.group(2).lower()
+
+
+def record_key(book, chapter, verse):
+    """The packed key write() gives a (book, chapter, verse) record."""
+    chapter, _ = parse_number(chapter)
+    verse, part = parse_number(verse)
+    return make_key(None if book is None else str(book), chapter, verse, part)
+
+
+# The columns are assembled with from_buffers: pa.array() and pa.table()
+# import pandas to check for DataFrames, and converting needs no pandas.
+def _int16_array(values):
+    numbers = np.frombuffer(values, dtype=np.int16) if len(values) else np.zeros(0, np.int16)
+    return pa.Array.from_buffers(pa.int16(), len(values),
+                                 [validity_bitmap(numbers >= 0), pa.py_buffer(values)])
+
+
+def _string_array(values):
+    """Arrow string array for a list of str/None."""
+    offsets = array("i", [0])
+    data = bytearray()
+    for value in values:
+        if value is not None:
+            data += value.encode("utf-8")
+        offsets.append(len(data))
+    valid = np.fromiter((value is not None for value in values), dtype=bool, count=len(values))
+    return pa.StringArray.from_buffers(len(values), pa.py_buffer(offsets), pa.py_buffer(data),
+                                       validity_bitmap(valid))
+
+
+class VerseStoreSink:
+    """Write verses to the parquet store one row group at a time.
+
+    The row groups go to `<name>.part`, which close() moves over the store
+    and abort() deletes, so a failed run leaves the previous store as it was.
+    """
+
+    def __init__(self, path, language, batch_size=4096):
+        self.path = Path(path)
+        self.partial = self.path.with_name(self.path.name + ".part")
+        self.language = language
+        self.batch_size = batch_size
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.writer = pq.ParquetWriter(self.partial, schema)
+        self.count = 0
+        self._reset()
+
+    def _reset(self):
+        self.table = VerseTable()
+        self.books = []
+        self.chapters = array("h")  # -1 = no chapter
+        self.verses = array("h")  # -1 = no verse
+        self.parts = array("b")  # index into PART_LETTERS
+
+    def write(self, book, chapter, verse, text, last=None):
+        """Add one verse, or the range verse..last, and return its packed key."""
+        chapter, _ = parse_number(chapter)
+        verse, part = parse_number(verse)
+        book = None if book is None else str(book)
+        key = make_key(book, chapter, verse, part)
+        end_key = None
+        if last is not None and key != NO_KEY:
+            end_key = make_key(book, chapter, *parse_number(last)) or key
+        self.table.append(key, "" if text is None else str(text), end_key)
+        self.books.append(book)
+        self.chapters.append(-1 if chapter is None else chapter)
+        self.verses.append(-1 if verse is None else verse)
+        self.parts.append(PART_LETTERS.index(part))
+        self.count += 1
+        if len(self.table) >= self.batch_size:
+            self.flush()
+        return key
+
+    def flush(self):
+        n = len(self.table)
+        if not n:
+            return
+        batch = pa.Table.from_arrays([
+            _string_array([self.language] * n),
+            _string_array(self.books),
+            self.table.key_array(),
+            self.table.key_array(end=True),
+            _int16_array(self.chapters),
+            _int16_array(self.verses),
+            _string_array([PART_LETTERS[p] for p in self.parts]),
+            self.table.text_array(),
+        ], schema=schema)
+        self.writer.write_table(batch)
+        self._reset()
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+        os.replace(self.partial, self.path)
+
+    def abort(self):
+        self.writer.close()
+        self.partial.unlink()
+
+
+def read_table(language, directory=None, columns=None):
+    """Load one language's store as a pyarrow Table."""
+    return pq.read_table(store_path(language, directory), columns=columns)
+
+
+def _key_array(keys):
+    return pa.Array.from_buffers(pa.int64(), len(keys),
+                                 [validity_bitmap(keys != NO_KEY), pa.py_buffer(keys)])
+
+
+def expand_table(table):
+    """One row per verse: each range row is repeated for every verse it covers.
+
+    `table` needs the key and end_key columns; key (and verse/part, if
+    loaded) are set to each verse's own values and end_key to key.
+    """
+    import pyarrow.compute as pc
+
+    keys = pc.fill_null(table["key"], NO_KEY).to_numpy()
+    end_keys = pc.fill_null(table["end_key"], NO_KEY).to_numpy()
+    rows, expanded = expand_ranges(keys, end_keys)
+    if len(rows) == table.num_rows:
+        return table
+    table = table.take(pa.Array.from_buffers(pa.int64(), len(rows), [None, pa.py_buffer(rows)]))
+    columns = {"key": _key_array(expanded), "end_key": _key_array(expanded)}
+    valid = expanded != NO_KEY
+    if "verse" in table.column_names:
+        verses = pc.fill_null(table["verse"], -1).to_numpy()
+        verses = np.where(valid, (expanded >> VERSE_SHIFT) & FIELD_MASK, verses).astype(np.int16)
+        columns["verse"] = _int16_array(verses)
+    if "part" in table.column_names:
+        parts = table["part"].to_pylist()
+        letters = expanded & PART_MASK
+        columns["part"] = _string_array([PART_LETTERS[letter] if ok else part
+                                         for part, letter, ok in zip(parts, letters, valid)])
+    for name, column in columns.items():
+        table = table.set_column(table.column_names.index(name), name, column)
+    return table
+
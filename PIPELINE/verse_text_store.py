@@ -0,0 +1,262 @@
+"""Memory-mapped verse text store: constant-time lookup of a verse by reference.
+
+Every converter also writes CONVERTED_FILES/<language>_verses.vtx next to
+its verse store, with the same keys and texts.  The file is opened with mmap, so opening it costs
+one system call and a lookup only touches the pages it reads:
+
+    header   b"VTX1", slot bits (uint32), verse count n (uint64)
+    keys     int64[n]        packed verse keys (see verse_key.py), sorted
+    offsets  int64[n + 1]    start of each text in the blob, plus the end
+    slots    int32[2**bits]  open-addressing hash table, key -> row (-1 = empty)
+    blob     UTF-8 texts, back to back
+
+A reference that appears on several rows of the verse store (a repeated
+verse number, a range written twice) has its texts joined with a space,
+the same way the multilingual corpus does.
+
+    python PIPELINE/verse_text_store.py                         # rebuild every language
+    python PIPELINE/verse_text_store.py --get "Matthew 1:1"     # look a verse up
+    python PIPELINE/verse_text_store.py english yami --get "Luke 2:7"
+"""
+import argparse
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+
+base_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(base_dir))
+
+from PIPELINE.verse_key import NO_KEY, make_key
+
+converted_dir = base_dir / "CONVERTED_FILES"
+
+MAGIC = b"VTX1"
+header = struct.Struct("<4sIQ")
+
+reference_re = re.compile(r"^\s*(.+?)\s+(\d+)\s*:\s*(\d+)\s*([a-z]?)\s*$", re.IGNORECASE)
+
+
+def text_store_path(language, directory=None):
+    return Path(directory or converted_dir) / f"{language}_verses.vtx"
+
+
+def _slot(key, bits):
+    # Fibonacci hashing: the top `bits` bits of key * 2**64 / golden ratio
+    return ((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> (64 - bits)
+
+
+class TextStoreSink:
+    """Collect (key, text) pairs and write them as a .vtx file on close.
+
+    Texts are spooled to a temporary file as they arrive and only their keys
+    and offsets stay in memory, so a whole Bible costs a few bytes per verse.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.keys = array("q")
+        self.starts = array("q", [0])  # start of each spooled text, plus the end
+        self.spool = tempfile.TemporaryFile()
+
+    def write(self, key, text):
+        if key == NO_KEY:
+            return
+        data = text.encode("utf-8")
+        self.spool.write(data)
+        self.keys.append(key)
+        self.starts.append(self.starts[-1] + len(data))
+
+    def close(self):
+        # Stable sort, so the texts of a repeated key are joined in write order
+        order = sorted(range(len(self.keys)), key=self.keys.__getitem__)
+        keys = array("q")
+        offsets = array("q", [0])
+        for row in order:
+            length = self.starts[row + 1] - self.starts[row]
+            if keys and keys[-1] == self.keys[row]:
+                offsets[-1] += 1 + length
+            else:
+                keys.append(self.keys[row])
+                offsets.append(offsets[-1] + length)
+
+        bits = 1
+        while (1 << bits) < 2 * len(keys):
+            bits += 1
+        slots = array("i", [-1]) * (1 << bits)
+        mask = (1 << bits) - 1
+        for row, key in enumerate(keys):
+            i = _slot(key, bits)
+            while slots[i] != -1:
+                i = (i + 1) & mask
+            slots[i] = row
+
+        # Written beside the file and moved over it, so readers never see half a store
+        partial = self.path.with_name(self.path.name + ".part")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.spool.flush()
+        with open(partial, "wb") as f:
+            f.write(header.pack(MAGIC, bits, len(keys)))
+            f.write(keys.tobytes())
+            f.write(offsets.tobytes())
+            f.write(slots.tobytes())
+            if self.starts[-1]:
+                with mmap.mmap(self.spool.fileno(), 0, access=mmap.ACCESS_READ) as spool:
+                    previous = None
+                    for row in order:
+                        if self.keys[row] == previous:
+                            f.write(b" ")
+                        f.write(spool[self.starts[row]:self.starts[row + 1]])
+                        previous = self.keys[row]
+        self.spool.close()
+        os.replace(partial, self.path)
+
+    def abort(self):
+        """Drop the spooled texts without writing the file (the run failed)."""
+        self.spool.close()
+
+
+def write_text_store(language, directory=None):
+    """Rebuild <language>_verses.vtx from the language's verse store and return its path."""
+    # Only this needs pyarrow; the converters feed a TextStoreSink directly
+    # and reading a .vtx file is plain mmap
+    from PIPELINE.verse_store import expand_table, read_table
+
+    table = expand_table(read_table(language, directory, columns=["key", "end_key", "text"]))
+    sink = TextStoreSink(text_store_path(language, directory))
+    for key, text in zip(table["key"].to_pylist(), table["text"].to_pylist()):
+        sink.write(key or NO_KEY, text)
+    sink.close()
+    return sink.path
+
+
+class VerseTextStore:
+    """Read-only view of one .vtx file.
+
+    store[key] and store.get(key) return the text of a packed verse key,
+    store.lookup("Matthew", 1, 1) does the same for a reference, and
+    store.view(key) returns the UTF-8 bytes as a memoryview into the mapping
+    without copying them.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.bits, self.count = header.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a verse text store")
+
+        buffer = memoryview(self._mmap)
+        start = header.size
+        self._keys = buffer[start:start + 8 * self.count].cast("q")
+        start += 8 * self.count
+        self._offsets = buffer[start:start + 8 * (self.count + 1)].cast("q")
+        start += 8 * (self.count + 1)
+        self._slots = buffer[start:start + 4 * (1 << self.bits)].cast("i")
+        start += 4 * (1 << self.bits)
+        self._blob = buffer[start:]
+        self._buffer = buffer
+        self._mask = (1 << self.bits) - 1
+
+    def _row(self, key):
+        i = _slot(key, self.bits)
+        while True:
+            row = self._slots[i]
+            if row == -1 or self._keys[row] == key:
+                return row
+            i = (i + 1) & self._mask
+
+    def view(self, key):
+        """The verse's UTF-8 bytes as a zero-copy memoryview, or None if it is missing."""
+        row = self._row(key) if key != NO_KEY else -1
+        if row == -1:
+            return None
+        return self._blob[self._offsets[row]:self._offsets[row + 1]]
+
+    def get(self, key, default=None):
+        text = self.view(key)
+        return default if text is None else str(text, "utf-8")
+
+    def __getitem__(self, key):
+        text = self.get(key)
+        if text is None:
+            raise KeyError(key)
+        return text
+
+    def __contains__(self, key):
+        return key != NO_KEY and self._row(key) != -1
+
+    def __len__(self):
+        return self.count
+
+    def keys(self):
+        """Packed keys in canon order."""
+        return iter(self._keys)
+
+    def lookup(self, book, chapter, verse, part=""):
+        """Text for a book name and chapter/verse numbers, or None."""
+        return self.get(make_key(book, chapter, verse, part))
+
+    def close(self):
+        for view in (self._keys, self._offsets, self._slots, self._blob, self._buffer):
+            view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_text_stores(languages, directory=None):
+    """{language: VerseTextStore} for the languages that have a .vtx file."""
+    stores = {}
+    for language in languages:
+        path = text_store_path(language, directory)
+        if path.exists():
+            stores[language] = VerseTextStore(path)
+    return stores
+
+
+def parse_reference(reference):
+    """'Matthew 1:6a' -> packed key (NO_KEY if the book or numbers are not recognised)."""
+    m = reference_re.match(reference)
+    if not m:
+        return NO_KEY
+    return make_key(m.group(1), int(m.group(2)), int(m.group(3)), m.group(4).lower())
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Build or query the verse text stores.")
+    arg_parser.add_argument("languages", nargs="*",
+                            help="languages to use (default: every verse store)")
+    arg_parser.add_argument("--get", metavar="REFERENCE",
+                            help='look up a reference such as "Matthew 1:1" instead of building')
+    args = arg_parser.parse_args()
+
+    languages = args.languages or sorted(
+        p.name[:-len("_verses.parquet")] for p in converted_dir.glob("*_verses.parquet"))
+
+    if args.get is None:
+        for language in languages:
+            print(f"Saved -> {write_text_store(language)}")
+        return
+
+    key = parse_reference(args.get)
+    if key == NO_KEY:
+        sys.exit(f"Unrecognised reference: {args.get}")
+    stores = open_text_stores(languages)
+    for language, store in stores.items():
+        print(f"{language}: {store.get(key, '')}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()